@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+
+        if settings.TIMEGARDEN_METRICS:
+            from .metrics import install_query_counter
+
+            connection_created.connect(install_query_counter, dispatch_uid="timegarden_metrics_query_counter")
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import FocusSession, FocusSessionArchive
+from .rollups import local_day_bounds, rebuild_daily_rollups, session_local_date
+
+
+def archive_cutoff(days, today=None):
+    """归档截止日期：早于该本地日期的专注记录可以归档"""
+    return (today or timezone.localdate()) - timedelta(days=days)
+
+
+def archivable_sessions(cutoff):
+    start, _ = local_day_bounds(cutoff)
+    return FocusSession.objects.filter(
+        Q(started_at__lt=start) | Q(started_at__isnull=True, created_at__lt=start)
+    )
+
+
+def archive_row(session):
+    garden_item = getattr(session, "garden_item", None)
+    return FocusSessionArchive(
+        user_id=session.user_id,
+        session_id=session.id,
+        garden_item_id=garden_item.id if garden_item else None,
+        task_id=session.task_id,
+        task_category=session.task.category if session.task else "",
+        date=session_local_date(session),
+        duration_minutes=session.duration_minutes,
+        is_completed=session.is_completed,
+        interrupted_reason=session.interrupted_reason,
+        started_at=session.started_at,
+        ended_at=session.ended_at,
+        created_at=session.created_at,
+        garden_date=garden_item.date if garden_item else None,
+        category=garden_item.category if garden_item else "",
+        item_type=garden_item.item_type if garden_item else "",
+        is_dead=garden_item.is_dead if garden_item else not session.is_completed,
+        garden_created_at=garden_item.created_at if garden_item else None,
+    )
+
+
+@transaction.atomic
+def archive_batch(user, sessions):
+    """把同一用户的一批专注记录连同花园条目迁入归档表，并按热表 + 归档表重算涉及日期的汇总"""
+    rows = FocusSessionArchive.objects.bulk_create([archive_row(session) for session in sessions])
+    FocusSession.objects.filter(id__in=[session.id for session in sessions]).delete()
+    rebuild_daily_rollups(user, {row.date for row in rows})
+    return len(rows)
+
+
+def archive_user_sessions(user, cutoff, batch_size):
+    """按主键顺序分批归档某个用户早于 cutoff 的专注记录，每批一个事务，返回归档条数"""
+    pending = archivable_sessions(cutoff).filter(user=user).select_related("task", "garden_item").order_by("id")
+    total = 0
+    while True:
+        sessions = list(pending[:batch_size])
+        if not sessions:
+            return total
+        total += archive_batch(user, sessions)
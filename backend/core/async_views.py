@@ -0,0 +1,164 @@
+"""统计与花园读取接口的异步版本，ASGI 模式下替换对应的同步视图。
+
+认证、条件请求与响应缓存的语义与同步视图一致（共享 token 缓存、ETag 与缓存键），
+数据库访问全部使用异步 ORM。WhiteNoise 中间件只有同步实现，请求仍会在 sync_to_async
+线程中经过中间件链，每个请求依旧占用一个线程。
+"""
+
+import copy
+from datetime import timedelta
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import token_cache
+from .cache import async_cache_per_user
+from .conditional import async_conditional_get
+from .models import DailyFocusRollup, Task
+from .rollups import astreak_days
+from .views import (
+    combine_changes,
+    garden_date_range,
+    garden_items_payload,
+    garden_items_querysets,
+    garden_summary_payload,
+    garden_summary_querysets,
+    overview_stats_payload,
+    today_stats_payload,
+)
+
+
+def api_response(data, status=200):
+    """与 DRF JSONRenderer 输出一致的 JSON 响应，data 属性供响应缓存使用"""
+    response = JsonResponse(
+        data, status=status, safe=False, encoder=JSONEncoder, json_dumps_params={"ensure_ascii": False, "separators": (",", ":")}
+    )
+    response.data = data
+    return response
+
+
+def auth_error(exc):
+    response = api_response({"detail": str(exc.detail)}, status=exc.status_code)
+    response["WWW-Authenticate"] = "Token"
+    return response
+
+
+async def authenticate(request):
+    """与 CachedTokenAuthentication + SessionAuthentication 相同的认证顺序，返回用户或 None"""
+    header = request.META.get("HTTP_AUTHORIZATION", "").split()
+    if header and header[0].lower() == "token":
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid token header. Token string should not contain spaces."))
+        key = header[1]
+        token = token_cache.get(key)
+        if token is None:
+            try:
+                token = await Token.objects.select_related("user", "user__profile").aget(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+            token_cache.set(key, token)
+        return copy.copy(token.user)
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def async_api_view(handler):
+    """只读异步接口：要求登录，request.user 为认证后的用户"""
+
+    @require_safe
+    @wraps(handler)
+    async def wrapped(request, *args, **kwargs):
+        try:
+            user = await authenticate(request)
+        except exceptions.AuthenticationFailed as exc:
+            return auth_error(exc)
+        if user is None:
+            return auth_error(exceptions.NotAuthenticated())
+        request.user = user
+        return await handler(request, *args, **kwargs)
+
+    return wrapped
+
+
+async def alatest_change(queryset, field):
+    result = await queryset.order_by().aaggregate(last_modified=Max(field), count=Count("id"))
+    return result["last_modified"], result["count"]
+
+
+async def focus_rollup_validator(request):
+    return await alatest_change(DailyFocusRollup.objects.filter(user=request.user), "updated_at")
+
+
+async def overview_stats_validator(request):
+    return combine_changes(
+        await alatest_change(DailyFocusRollup.objects.filter(user=request.user), "updated_at"),
+        await alatest_change(Task.objects.filter(user=request.user), "updated_at"),
+    )
+
+
+def garden_items_validator(default_range, allowed_ranges):
+    async def validator(request):
+        date_range, error = garden_date_range(request.GET, default_range, allowed_ranges)
+        if error:
+            return None
+        items, archived = garden_items_querysets(request.user, *date_range)
+        return combine_changes(await alatest_change(items, "created_at"), await alatest_change(archived, "garden_created_at"))
+
+    return validator
+
+
+@async_api_view
+@async_conditional_get(focus_rollup_validator, "TodayStatsView.get")
+@async_cache_per_user("TodayStatsView.get", api_response)
+async def today_stats(request):
+    today = timezone.localdate()
+    rollup = await DailyFocusRollup.objects.filter(user=request.user, date=today).afirst()
+    return api_response(today_stats_payload(rollup, await astreak_days(request.user, today)))
+
+
+@async_api_view
+@async_conditional_get(overview_stats_validator, "OverviewStatsView.get")
+@async_cache_per_user("OverviewStatsView.get", api_response)
+async def overview_stats(request):
+    today = timezone.localdate()
+    days = int(request.GET.get("days", 7))
+    start_date = today - timedelta(days=days - 1)
+    rollups = [
+        rollup
+        async for rollup in DailyFocusRollup.objects.filter(user=request.user, date__gte=start_date, date__lte=today)
+    ]
+    total_tasks = await Task.objects.filter(user=request.user).acount()
+    completed_tasks = await Task.objects.filter(user=request.user, status="done").acount()
+    return api_response(overview_stats_payload(start_date, days, rollups, total_tasks, completed_tasks))
+
+
+@async_api_view
+@async_conditional_get(garden_items_validator("day", ("day", "week", "month")), "GardenItemListView.get")
+async def garden_items(request):
+    date_range, error = garden_date_range(request.GET, "day", ("day", "week", "month"))
+    if error:
+        return api_response({"detail": error}, status=400)
+    items, archived = garden_items_querysets(request.user, *date_range)
+    return api_response(garden_items_payload([item async for item in items], [row async for row in archived]))
+
+
+@async_api_view
+@async_conditional_get(garden_items_validator("week", ("week", "month")), "GardenItemSummaryView.get")
+@async_cache_per_user("GardenItemSummaryView.get", api_response)
+async def garden_summary(request):
+    date_range, error = garden_date_range(request.GET, "week", ("week", "month"))
+    if error:
+        return api_response({"detail": error}, status=400)
+    by_date, by_category = garden_summary_querysets(request.user, *date_range)
+    return api_response(
+        garden_summary_payload([entry async for entry in by_date], [entry async for entry in by_category])
+    )
@@ -0,0 +1,94 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+DATA_VERSION_KEY = "tg:data-version:{user_id}"
+VIEW_CACHE_KEY = "tg:view:{name}:{user_id}:{version}:{day}:{path}"
+
+
+def data_version(user_id):
+    """用户数据版本号，任意写入都会使其变化；缺失时用纳秒时间戳初始化，避免与淘汰前的版本冲突"""
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def adata_version(user_id):
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_data_version(user_id):
+    """在事务提交后递增用户数据版本号，使该用户的缓存响应全部失效"""
+
+    def bump():
+        key = DATA_VERSION_KEY.format(user_id=user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def view_cache_key(name, request, version):
+    return VIEW_CACHE_KEY.format(
+        name=name,
+        user_id=request.user.pk,
+        version=version,
+        day=timezone.localdate().isoformat(),
+        path=hashlib.md5(request.get_full_path().encode("utf-8")).hexdigest(),
+    )
+
+
+def cache_per_user(handler):
+    """按用户 + 数据版本 + 本地日期 + 完整路径缓存 APIView 的 GET 响应数据"""
+
+    @wraps(handler)
+    def wrapped(self, request, *args, **kwargs):
+        key = view_cache_key(handler.__qualname__, request, data_version(request.user.pk))
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.TIMEGARDEN_STATS_CACHE_TIMEOUT)
+        return response
+
+    return wrapped
+
+
+def async_cache_per_user(name, render):
+    """cache_per_user 的异步版本：处理函数返回带 data 属性的响应，命中时用 render(data) 重建响应。
+
+    name 与对应同步视图一致，两种服务模式共享同一份缓存。
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapped(request, *args, **kwargs):
+            key = view_cache_key(name, request, await adata_version(request.user.pk))
+            data = await cache.aget(key)
+            if data is not None:
+                return render(data)
+            response = await handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                await cache.aset(key, response.data, settings.TIMEGARDEN_STATS_CACHE_TIMEOUT)
+            return response
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,103 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import adata_version, data_version, view_cache_key
+
+
+def conditional_etag(name, request, last_modified, fingerprint):
+    """由处理函数名、完整路径、本地日期与校验值计算 (etag, last_modified 时间戳)"""
+    raw = repr((name, request.get_full_path(), timezone.localdate(), last_modified, fingerprint))
+    etag = quote_etag(hashlib.md5(raw.encode("utf-8")).hexdigest())
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return etag, timestamp
+
+
+def validator_cache_key(name, request, version):
+    return view_cache_key(f"{name}:validator", request, version)
+
+
+def cached_validate(name, request, validate):
+    """校验值按用户数据版本缓存：版本未变时数据未变，重复请求（包括 304）无需再执行聚合查询"""
+    key = validator_cache_key(name, request, data_version(request.user.pk))
+    validated = cache.get(key)
+    if validated is None:
+        validated = validate()
+        if validated is not None:
+            cache.set(key, validated, settings.TIMEGARDEN_STATS_CACHE_TIMEOUT)
+    return validated
+
+
+async def acached_validate(name, request, validate):
+    key = validator_cache_key(name, request, await adata_version(request.user.pk))
+    validated = await cache.aget(key)
+    if validated is None:
+        validated = await validate()
+        if validated is not None:
+            await cache.aset(key, validated, settings.TIMEGARDEN_STATS_CACHE_TIMEOUT)
+    return validated
+
+
+def finish_conditional(response, etag, timestamp):
+    if response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+        if timestamp:
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+        # 允许浏览器保存副本，但每次使用前都必须携带校验值重新验证
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_get(validator):
+    """为 GET 处理函数提供 ETag / Last-Modified 条件请求支持。
+
+    validator(view, request) 返回 (last_modified, fingerprint)，通常来自一次 Max + Count 聚合，
+    无需序列化响应体即可判断是否返回 304；返回 None 时跳过条件判断（例如参数非法）。
+    校验值按用户数据版本缓存，因此 validator 只能依赖当前用户的数据（写入时会递增数据版本）。
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapped(self, request, *args, **kwargs):
+            validated = cached_validate(handler.__qualname__, request, lambda: validator(self, request))
+            if validated is None:
+                return handler(self, request, *args, **kwargs)
+            etag, timestamp = conditional_etag(handler.__qualname__, request, *validated)
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = handler(self, request, *args, **kwargs)
+            return finish_conditional(response, etag, timestamp)
+
+        return wrapped
+
+    return decorator
+
+
+def async_conditional_get(validator, name):
+    """conditional_get 的异步版本，用于函数视图：await validator(request)。
+
+    name 与对应同步视图的处理函数名一致，两种服务模式下同一资源的 ETag 相同。
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapped(request, *args, **kwargs):
+            validated = await acached_validate(name, request, lambda: validator(request))
+            if validated is None:
+                return await handler(request, *args, **kwargs)
+            etag, timestamp = conditional_etag(name, request, *validated)
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = await handler(request, *args, **kwargs)
+            return finish_conditional(response, etag, timestamp)
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import DailyFocusRollup, SiteCounter, SiteDailyRollup, Task, UserProfile, UserStats
+
+USERS = "users"
+FOCUS_MINUTES = "focus_minutes"
+FOCUS_SESSIONS = "focus_sessions"
+TODAY_PLAN_USERS = "today_plan_users"
+SCENE_PREFIX = "scene:"
+
+
+def add_to_counter(name, amount):
+    if not amount:
+        return
+    updated = SiteCounter.objects.filter(name=name).update(value=F("value") + amount)
+    if not updated:
+        SiteCounter.objects.get_or_create(name=name)
+        SiteCounter.objects.filter(name=name).update(value=F("value") + amount)
+
+
+@transaction.atomic
+def apply_focus_deltas(deltas):
+    """deltas: {date: (minutes, sessions)}，累加到全站总量与全站日汇总"""
+    total_minutes = Decimal("0")
+    total_sessions = 0
+    for day, (minutes, sessions) in deltas.items():
+        if not minutes and not sessions:
+            continue
+        SiteDailyRollup.objects.get_or_create(date=day)
+        SiteDailyRollup.objects.filter(date=day).update(
+            total_minutes=F("total_minutes") + minutes,
+            session_count=F("session_count") + sessions,
+        )
+        total_minutes += minutes
+        total_sessions += sessions
+    add_to_counter(FOCUS_MINUTES, total_minutes)
+    add_to_counter(FOCUS_SESSIONS, total_sessions)
+
+
+def scene_counter(scene):
+    return f"{SCENE_PREFIX}{scene}"
+
+
+@transaction.atomic
+def refresh_today_plan(user_id):
+    """任务写入后检查该用户是否仍有今日计划，状态翻转时调整全站计数"""
+    has_plan = Task.objects.filter(user_id=user_id, is_today=True).exists()
+    stats, _ = UserStats.objects.select_for_update().get_or_create(user_id=user_id)
+    if stats.has_today_plan == has_plan:
+        return
+    stats.has_today_plan = has_plan
+    stats.save(update_fields=["has_today_plan", "updated_at"])
+    add_to_counter(TODAY_PLAN_USERS, 1 if has_plan else -1)
+
+
+@transaction.atomic
+def forget_user(user):
+    """删除用户前扣除其对全站计数的贡献（级联删除不会逐条更新计数）"""
+    deltas = {
+        rollup.date: (-rollup.total_minutes, -rollup.session_count)
+        for rollup in DailyFocusRollup.objects.filter(user=user)
+    }
+    apply_focus_deltas(deltas)
+    if UserStats.objects.filter(user=user, has_today_plan=True).exists():
+        add_to_counter(TODAY_PLAN_USERS, -1)
+
+
+def read_counters():
+    return {counter.name: counter.value for counter in SiteCounter.objects.all()}
+
+
+@transaction.atomic
+def reconcile_counters():
+    """从源数据完整重算全站计数，用于定期校准"""
+    has_plan = set(Task.objects.filter(is_today=True).values_list("user_id", flat=True).distinct())
+    UserStats.objects.exclude(user_id__in=has_plan).update(has_today_plan=False)
+    UserStats.objects.filter(user_id__in=has_plan).update(has_today_plan=True)
+    missing = User.objects.filter(stats__isnull=True).values_list("id", flat=True)
+    UserStats.objects.bulk_create([UserStats(user_id=user_id, has_today_plan=user_id in has_plan) for user_id in missing])
+
+    user_rollups = DailyFocusRollup.objects.filter(user=OuterRef("user")).values("user")
+    UserStats.objects.update(
+        total_focus_minutes=Coalesce(Subquery(user_rollups.annotate(total=Sum("total_minutes")).values("total")), 0),
+        total_sessions=Coalesce(Subquery(user_rollups.annotate(total=Sum("session_count")).values("total")), 0),
+    )
+
+    totals = DailyFocusRollup.objects.aggregate(minutes=Sum("total_minutes"), sessions=Sum("session_count"))
+    values = {
+        USERS: User.objects.count(),
+        FOCUS_MINUTES: totals["minutes"] or 0,
+        FOCUS_SESSIONS: totals["sessions"] or 0,
+        TODAY_PLAN_USERS: len(has_plan),
+    }
+    for entry in UserProfile.objects.values("default_scene").annotate(count=Count("id")):
+        values[scene_counter(entry["default_scene"])] = entry["count"]
+    SiteCounter.objects.all().delete()
+    SiteCounter.objects.bulk_create([SiteCounter(name=name, value=value) for name, value in values.items()])
+
+    daily = DailyFocusRollup.objects.values("date").annotate(minutes=Sum("total_minutes"), sessions=Sum("session_count"))
+    SiteDailyRollup.objects.all().delete()
+    SiteDailyRollup.objects.bulk_create(
+        [SiteDailyRollup(date=row["date"], total_minutes=row["minutes"], session_count=row["sessions"]) for row in daily],
+        batch_size=500,
+    )
+    return values
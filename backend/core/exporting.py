@@ -0,0 +1,157 @@
+import csv
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from .models import FocusSession, FocusSessionArchive, GardenItem, MoodRecord, Task
+
+EXPORT_CHUNK_SIZE = 1000
+
+# 导出分区：名称 -> (模型, 字段)，按主键顺序逐批读取
+EXPORT_SECTIONS = {
+    "tasks": (
+        Task,
+        (
+            "id",
+            "title",
+            "category",
+            "status",
+            "priority",
+            "deadline",
+            "is_today",
+            "estimated_pomodoros",
+            "created_at",
+            "updated_at",
+        ),
+    ),
+    "sessions": (
+        FocusSession,
+        (
+            "id",
+            "task_id",
+            "duration_minutes",
+            "is_completed",
+            "interrupted_reason",
+            "started_at",
+            "ended_at",
+            "created_at",
+        ),
+    ),
+    "garden": (GardenItem, ("id", "session_id", "date", "category", "item_type", "is_dead", "created_at")),
+    "moods": (MoodRecord, ("id", "date", "mood", "note", "updated_at")),
+    "archived_sessions": (
+        FocusSessionArchive,
+        (
+            "session_id",
+            "task_id",
+            "task_category",
+            "date",
+            "duration_minutes",
+            "is_completed",
+            "interrupted_reason",
+            "started_at",
+            "ended_at",
+            "created_at",
+            "garden_item_id",
+            "garden_date",
+            "category",
+            "item_type",
+            "is_dead",
+            "garden_created_at",
+        ),
+    ),
+}
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+class Echo:
+    """csv.writer 的伪文件对象：write 直接返回内容，便于逐行产出"""
+
+    def write(self, value):
+        return value
+
+
+class CSVStreamRenderer(BaseRenderer):
+    """用于内容协商；正常导出由 StreamingHttpResponse 直接产出，这里只渲染错误信息"""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not isinstance(data, dict):
+            data = {"detail": data}
+        return "".join(iter_csv(data.keys(), [data.values()])).encode(self.charset)
+
+
+class NDJSONStreamRenderer(BaseRenderer):
+    """同上，错误信息渲染为单行 JSON"""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (DjangoJSONEncoder(ensure_ascii=False).encode(data) + "\n").encode(self.charset)
+
+
+def csv_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat(timespec="seconds")
+    return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(Echo())
+    # UTF-8 BOM，方便 Excel 正确识别中文
+    yield "\ufeff" + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([csv_value(value) for value in row])
+
+
+def csv_response(filename, header, rows):
+    response = StreamingHttpResponse(iter_csv(header, rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_rows(user, section):
+    """逐批读取某个分区的数据，内存占用与数据量无关"""
+    model, fields = EXPORT_SECTIONS[section]
+    return model.objects.filter(user=user).order_by("id").values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def iter_ndjson(user, sections):
+    """每行一个 JSON 对象，type 字段标明所属分区"""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for section in sections:
+        fields = EXPORT_SECTIONS[section][1]
+        for row in export_rows(user, section):
+            yield encoder.encode({"type": section, **dict(zip(fields, row))}) + "\n"
+
+
+def iter_export(user, fmt, sections):
+    """CSV 需要统一表头，因此每次只导出一个分区；NDJSON 可导出多个分区"""
+    if fmt == "csv":
+        section = sections[0]
+        return iter_csv(EXPORT_SECTIONS[section][1], export_rows(user, section))
+    return iter_ndjson(user, sections)
+
+
+def export_response(user, fmt, sections):
+    if fmt == "csv":
+        content_type = "text/csv; charset=utf-8"
+        filename = f"timegarden-{user.username}-{sections[0]}.csv"
+    else:
+        content_type = "application/x-ndjson; charset=utf-8"
+        filename = f"timegarden-{user.username}.ndjson"
+    response = StreamingHttpResponse(iter_export(user, fmt, sections), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
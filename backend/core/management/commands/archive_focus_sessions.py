@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archiving import archivable_sessions, archive_cutoff, archive_user_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Move focus sessions (and their garden items) older than N days into the archive table. "
+        "A running server using the default in-memory cache cannot see this process's cache "
+        "invalidation and may serve stale stats for up to TIMEGARDEN_STATS_CACHE_TIMEOUT seconds; "
+        "set TIMEGARDEN_CACHE_DIR so the server and this command share a file cache"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TIMEGARDEN_ARCHIVE_AFTER_DAYS,
+            help="归档早于多少天之前（按本地日期）的专注记录",
+        )
+        parser.add_argument("--username", help="仅归档指定用户")
+        parser.add_argument("--batch-size", type=int, default=1000, help="每个事务迁移的记录条数")
+        parser.add_argument("--dry-run", action="store_true", help="只统计可归档的记录，不做修改")
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("--days 必须大于 0")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size 必须大于 0")
+        cutoff = archive_cutoff(options["days"])
+        sessions = archivable_sessions(cutoff)
+        users = User.objects.order_by("id")
+        if options["username"]:
+            users = users.filter(username=options["username"])
+            if not users.exists():
+                raise CommandError(f"用户不存在: {options['username']}")
+            sessions = sessions.filter(user__in=users)
+        users = users.filter(id__in=sessions.values("user_id"))
+
+        if options["dry_run"]:
+            self.stdout.write(f"{cutoff} 之前可归档 {users.count()} 个用户的 {sessions.count()} 条专注记录")
+            return
+
+        total_users = 0
+        total_sessions = 0
+        for user in users.iterator():
+            total_sessions += archive_user_sessions(user, cutoff, options["batch_size"])
+            total_users += 1
+
+        self.stdout.write(self.style.SUCCESS(f"已归档 {total_users} 个用户在 {cutoff} 之前的 {total_sessions} 条专注记录"))
@@ -0,0 +1,157 @@
+import json
+import math
+import re
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core import urls as core_urls
+from core.authentication import token_cache
+
+PK_GROUP = re.compile(r"\(\?P<pk>[^)]*\)")
+
+
+def walk_patterns(patterns, prefix=""):
+    for pattern in patterns:
+        if hasattr(pattern, "url_patterns"):
+            yield from walk_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        else:
+            yield prefix + str(pattern.pattern), pattern.callback
+
+
+def supports_get(callback):
+    actions = getattr(callback, "actions", None)
+    if actions is not None:
+        return "get" in actions
+    view_class = getattr(callback, "cls", None) or getattr(callback, "view_class", None)
+    if view_class is not None:
+        return hasattr(view_class, "get")
+    # 函数视图（异步读取接口）均为 GET
+    return True
+
+
+def sample_pk(callback, user):
+    """详情路由使用该用户（或全站）最新一条记录的主键"""
+    model = callback.cls.serializer_class.Meta.model
+    queryset = model.objects.all()
+    if any(field.name == "user" for field in model._meta.fields):
+        queryset = queryset.filter(user=user)
+    return queryset.order_by("-pk").values_list("pk", flat=True).first()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = "Benchmark every GET endpoint in core/urls.py through the test client (p50/p95 latency, queries, size)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="以该用户身份请求，默认取 seed_demo_data 生成的第一个用户")
+        parser.add_argument("--admin-username", help="管理员接口使用的用户，未指定时跳过 admin/ 接口")
+        parser.add_argument("--repeat", type=int, default=20, help="每个接口的计时请求次数")
+        parser.add_argument("--warmup", type=int, default=1, help="计时前的预热请求次数")
+        parser.add_argument("--cold", action="store_true", help="每次请求前清空响应缓存与 token 缓存")
+        parser.add_argument("--only", action="append", default=[], help="只测试路径包含该字符串的接口，可重复")
+        parser.add_argument("--json", dest="json_path", help="同时把结果写入 JSON 文件")
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat 必须大于 0")
+        user = self.get_user(options["username"])
+        admin = self.get_user(options["admin_username"]) if options["admin_username"] else None
+        clients = {user.pk: self.client_for(user)}
+        if admin:
+            clients[admin.pk] = self.client_for(admin)
+
+        results = []
+        for route, callback in walk_patterns(core_urls.urlpatterns):
+            if "format" in route or not supports_get(callback):
+                continue
+            path = route.lstrip("^").rstrip("$")
+            if options["only"] and not any(item in path for item in options["only"]):
+                continue
+            owner = admin if path.startswith("admin/") else user
+            if owner is None:
+                continue
+            if PK_GROUP.search(path):
+                pk = sample_pk(callback, owner)
+                if pk is None:
+                    continue
+                path = PK_GROUP.sub(str(pk), path)
+            results.append(self.measure(f"/api/{path}", clients[owner.pk], options))
+
+        self.print_table(results)
+        if options["json_path"]:
+            report = {
+                "generated_at": timezone.now().isoformat(),
+                "username": user.username,
+                "repeat": options["repeat"],
+                "cold": options["cold"],
+                "results": results,
+            }
+            with open(options["json_path"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['json_path']}"))
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"用户不存在: {username}")
+            return user
+        user = User.objects.filter(username__startswith="demo").order_by("username").first()
+        if user is None:
+            raise CommandError("没有可用的用户，请先执行 seed_demo_data 或通过 --username 指定")
+        return user
+
+    def client_for(self, user):
+        token, _ = Token.objects.get_or_create(user=user)
+        return Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def request(self, client, path, options):
+        if options["cold"]:
+            cache.clear()
+            token_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(path)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = (time.perf_counter() - started) * 1000
+        return response.status_code, elapsed, len(queries), size
+
+    def measure(self, path, client, options):
+        for _ in range(options["warmup"]):
+            self.request(client, path, options)
+        samples = [self.request(client, path, options) for _ in range(options["repeat"])]
+        timings = [elapsed for _, elapsed, _, _ in samples]
+        return {
+            "path": path,
+            "status": samples[-1][0],
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "queries": statistics.median_low([count for _, _, count, _ in samples]),
+            "bytes": samples[-1][3],
+        }
+
+    def print_table(self, results):
+        header = f"{'endpoint':<40} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'bytes':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in results:
+            self.stdout.write(
+                f"{row['path']:<40} {row['status']:>6} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+                f"{row['queries']:>8} {row['bytes']:>10}"
+            )
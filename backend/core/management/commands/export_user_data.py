@@ -0,0 +1,43 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exporting import EXPORT_FORMATS, EXPORT_SECTIONS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream a user's tasks, focus sessions, garden items and moods as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", required=True, help="要导出的用户")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", help="导出格式")
+        parser.add_argument(
+            "--type",
+            action="append",
+            choices=list(EXPORT_SECTIONS),
+            help="导出的数据类型，可重复指定；CSV 仅支持单个类型，默认导出全部",
+        )
+        parser.add_argument("--output", help="输出文件路径，默认写到标准输出")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"用户不存在: {options['username']}")
+        sections = options["type"] or list(EXPORT_SECTIONS)
+        if options["format"] == "csv" and len(sections) != 1:
+            raise CommandError("CSV 导出需要通过 --type 指定单个类型")
+
+        lines = 0
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                for line in iter_export(user, options["format"], sections):
+                    output.write(line)
+                    lines += 1
+            self.stdout.write(self.style.SUCCESS(f"已导出 {lines} 行到 {options['output']}"))
+        else:
+            for line in iter_export(user, options["format"], sections):
+                sys.stdout.write(line)
+                lines += 1
+            # 数据占用标准输出，汇总信息写到标准错误
+            self.stderr.write(f"已导出 {lines} 行")
@@ -0,0 +1,253 @@
+import http.client
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, transaction
+from rest_framework.authtoken.models import Token
+
+from core.management.commands.benchmark_api import percentile
+from core.models import Task, UserProfile
+
+DEFAULT_MIX = "dashboard=6,session=2,toggle=2"
+OPERATIONS = ("dashboard", "session", "toggle")
+
+
+class LockedErrorCounter(logging.Handler):
+    """统计服务端记录的 database is locked 异常（DEBUG 关闭时 500 响应体不包含异常信息）"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        exc = record.exc_info[1] if record.exc_info else None
+        if isinstance(exc, OperationalError) and "database is locked" in str(exc):
+            with self._lock:
+                self.count += 1
+
+
+def parse_mix(value):
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise CommandError(f"未知的请求类型: {name}，可选 {', '.join(OPERATIONS)}")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"无效的权重: {part}")
+    if not any(weights.values()):
+        raise CommandError("--mix 至少需要一个大于 0 的权重")
+    return weights
+
+
+class SimulatedUser(threading.Thread):
+    """一个模拟用户：使用独立的 keep-alive 连接按权重循环发送请求"""
+
+    def __init__(self, host, port, token, task_ids, weights, seed, deadline, results):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.headers = {"Authorization": f"Token {token}", "Content-Type": "application/json"}
+        self.task_ids = task_ids
+        self.names = list(weights)
+        self.weights = list(weights.values())
+        self.rng = random.Random(seed)
+        self.deadline = deadline
+        self.results = results
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            while time.monotonic() < self.deadline:
+                name = self.rng.choices(self.names, self.weights)[0]
+                method, path, body = self.build(name)
+                started = time.perf_counter()
+                try:
+                    conn.request(method, path, body=body, headers=self.headers)
+                    response = conn.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                    status = 0
+                self.results.append((name, status, (time.perf_counter() - started) * 1000))
+        finally:
+            conn.close()
+
+    def build(self, name):
+        if name == "dashboard":
+            return "GET", "/api/dashboard/", None
+        if name == "toggle":
+            return "POST", f"/api/tasks/{self.rng.choice(self.task_ids)}/set_today/", b""
+        payload = {
+            "duration_minutes": self.rng.choice([15, 25, 25, 45]),
+            "is_completed": self.rng.random() < 0.85,
+            "task": self.rng.choice(self.task_ids),
+        }
+        return "POST", "/api/sessions/", json.dumps(payload).encode("utf-8")
+
+
+class Command(BaseCommand):
+    help = "Drive mixed concurrent traffic against an in-process waitress server and report throughput, latency and SQLite lock errors"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="并发模拟用户数")
+        parser.add_argument("--duration", type=float, default=30, help="压测时长（秒）")
+        parser.add_argument("--threads", type=int, default=4, help="waitress 工作线程数")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"请求类型权重，默认 {DEFAULT_MIX}")
+        parser.add_argument("--tasks-per-user", type=int, default=10, help="每个模拟用户预先创建的任务数")
+        parser.add_argument("--prefix", default="loadtest", help="模拟用户的用户名前缀")
+        parser.add_argument("--seed", type=int, default=42, help="随机种子")
+        parser.add_argument("--keep-data", action="store_true", help="结束后保留模拟用户及其数据")
+        parser.add_argument("--json", dest="json_path", help="同时把结果写入 JSON 文件")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["threads"] < 1 or options["duration"] <= 0:
+            raise CommandError("--users、--threads、--duration 必须大于 0")
+        if options["tasks_per_user"] < 1:
+            raise CommandError("--tasks-per-user 必须大于 0，切换今日计划需要任务")
+        weights = parse_mix(options["mix"])
+        user_ids, accounts = self.prepare_users(options)
+
+        from timegarden.wsgi import application
+        from waitress import create_server
+
+        server = create_server(application, host="127.0.0.1", port=0, threads=options["threads"])
+        server_thread = threading.Thread(target=server.run, name="waitress", daemon=True)
+        server_thread.start()
+        locked = LockedErrorCounter()
+        request_logger = logging.getLogger("django.request")
+        request_logger.addHandler(locked)
+        # 压测时队列积压是预期现象，屏蔽 waitress 的逐条队列深度警告
+        queue_logger = logging.getLogger("waitress.queue")
+        queue_level = queue_logger.level
+        queue_logger.setLevel(logging.ERROR)
+
+        results = []
+        try:
+            self.stdout.write(
+                f"压测 {options['duration']:g} 秒：{options['users']} 个模拟用户，waitress {options['threads']} 线程，"
+                f"端口 {server.effective_port}"
+            )
+            started = time.monotonic()
+            deadline = started + options["duration"]
+            clients = [
+                SimulatedUser(
+                    "127.0.0.1",
+                    server.effective_port,
+                    token,
+                    task_ids,
+                    weights,
+                    f"{options['seed']}:{index}",
+                    deadline,
+                    results,
+                )
+                for index, (token, task_ids) in enumerate(accounts)
+            ]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+            elapsed = time.monotonic() - started
+        finally:
+            request_logger.removeHandler(locked)
+            queue_logger.setLevel(queue_level)
+            # 先等待工作线程处理完剩余任务，再关闭监听与触发器
+            server.task_dispatcher.shutdown()
+            server.close()
+            server_thread.join(timeout=5)
+            if not options["keep_data"]:
+                # 只删除本次创建的模拟用户
+                User.objects.filter(id__in=user_ids).delete()
+
+        report = self.summarize(results, elapsed, locked.count, options)
+        self.print_report(report)
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"结果已写入 {options['json_path']}"))
+
+    @transaction.atomic
+    def prepare_users(self, options):
+        """创建本次压测专用的模拟用户；同名用户已存在时报错，避免接管并在结束后删除真实账号"""
+        usernames = [f"{options['prefix']}{index:04d}" for index in range(1, options["users"] + 1)]
+        existing = list(User.objects.filter(username__in=usernames).values_list("username", flat=True)[:5])
+        if existing:
+            raise CommandError(f"用户已存在: {', '.join(existing)}，请通过 --prefix 指定其他前缀")
+        user_ids = []
+        accounts = []
+        for username in usernames:
+            user = User.objects.create(username=username)
+            UserProfile.objects.create(user=user)
+            Task.objects.bulk_create(
+                [Task(user=user, title=f"压测任务 {number}") for number in range(1, options["tasks_per_user"] + 1)]
+            )
+            token = Token.objects.create(user=user)
+            task_ids = list(Task.objects.filter(user=user).values_list("id", flat=True))
+            user_ids.append(user.id)
+            accounts.append((token.key, task_ids))
+        return user_ids, accounts
+
+    def summarize(self, results, elapsed, locked_errors, options):
+        by_operation = defaultdict(list)
+        statuses = Counter()
+        for name, status, latency in results:
+            by_operation[name].append(latency)
+            statuses[status] += 1
+        total = len(results)
+        errors = sum(count for status, count in statuses.items() if status == 0 or status >= 500)
+
+        def latency_summary(values):
+            return {
+                "count": len(values),
+                "p50_ms": round(statistics.median(values), 2),
+                "p95_ms": round(percentile(values, 0.95), 2),
+                "p99_ms": round(percentile(values, 0.99), 2),
+                "max_ms": round(max(values), 2),
+            }
+
+        return {
+            "users": options["users"],
+            "threads": options["threads"],
+            "duration_s": round(elapsed, 2),
+            "mix": options["mix"],
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0,
+            "locked_errors": locked_errors,
+            "locked_rate": round(locked_errors / total, 4) if total else 0,
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            "latency": latency_summary([latency for _, _, latency in results]) if results else None,
+            "operations": {name: latency_summary(values) for name, values in sorted(by_operation.items())},
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"请求 {report['requests']} 次，吞吐 {report['throughput_rps']} req/s，"
+            f"错误 {report['errors']}（{report['error_rate']:.2%}），"
+            f"database is locked {report['locked_errors']}（{report['locked_rate']:.2%}）"
+        )
+        self.stdout.write(f"状态码分布: {report['statuses']}")
+        header = f"{'operation':<12} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        rows = list(report["operations"].items())
+        if report["latency"]:
+            rows.append(("all", report["latency"]))
+        for name, row in rows:
+            self.stdout.write(
+                f"{name:<12} {row['count']:>7} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+                f"{row['p99_ms']:>9.2f} {row['max_ms']:>9.2f}"
+            )
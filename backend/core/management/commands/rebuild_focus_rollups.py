@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.rollups import rebuild_user_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild daily focus rollups from raw focus sessions, including archived ones. "
+        "A running server using the default in-memory cache cannot see this process's cache "
+        "invalidation and may serve stale stats for up to TIMEGARDEN_STATS_CACHE_TIMEOUT seconds; "
+        "set TIMEGARDEN_CACHE_DIR so the server and this command share a file cache"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="仅重建指定用户")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("id")
+        if options["username"]:
+            users = users.filter(username=options["username"])
+            if not users.exists():
+                raise CommandError(f"用户不存在: {options['username']}")
+
+        total_users = 0
+        total_days = 0
+        for user in users.iterator():
+            total_days += rebuild_user_rollups(user)
+            total_users += 1
+
+        self.stdout.write(self.style.SUCCESS(f"已重建 {total_users} 个用户的 {total_days} 条日汇总"))
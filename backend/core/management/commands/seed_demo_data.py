@@ -0,0 +1,134 @@
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.counters import reconcile_counters
+from core.models import FocusSession, GardenItem, MoodRecord, Task, UserProfile
+from core.rollups import rebuild_user_rollups
+from core.views import garden_item_fields
+
+CATEGORIES = ["学习", "工作", "生活", "study", "work", ""]
+SCENES = ["rain", "meditation", "ktv", "none"]
+INTERRUPTED_REASONS = ["被打断", "临时会议", "休息", ""]
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Deterministically seed demo users with tasks, focus sessions, garden items and moods using bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=3, help="用户数量")
+        parser.add_argument("--days", type=int, default=3 * 365, help="每个用户的历史天数（截至今天）")
+        parser.add_argument("--sessions-per-day", type=float, default=4, help="每个活跃日平均番茄数")
+        parser.add_argument("--active-ratio", type=float, default=0.8, help="有专注记录的天数比例")
+        parser.add_argument("--tasks", type=int, default=300, help="每个用户的任务数")
+        parser.add_argument("--mood-ratio", type=float, default=0.6, help="有心情记录的天数比例")
+        parser.add_argument("--prefix", default="demo", help="用户名前缀，用户名为 <prefix>0001 形式")
+        parser.add_argument("--password", default="demo12345", help="所有演示用户的密码")
+        parser.add_argument("--seed", type=int, default=42, help="随机种子，相同参数生成完全相同的数据")
+        parser.add_argument("--reset", action="store_true", help="先删除同前缀的已有演示用户")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["days"] < 1:
+            raise CommandError("--users 与 --days 必须大于 0")
+        prefix = options["prefix"]
+        usernames = [f"{prefix}{index:04d}" for index in range(1, options["users"] + 1)]
+        existing = User.objects.filter(username__in=usernames)
+        if existing.exists():
+            if not options["reset"]:
+                raise CommandError(f"已存在前缀为 {prefix} 的演示用户，使用 --reset 重新生成")
+            existing.delete()
+
+        # 所有用户共用一个密码哈希，避免逐个计算
+        password = make_password(options["password"])
+        totals = {"tasks": 0, "sessions": 0, "moods": 0}
+        for index, username in enumerate(usernames):
+            rng = random.Random(f"{options['seed']}:{index}")
+            counts = self.seed_user(username, password, rng, options)
+            for name, count in counts.items():
+                totals[name] += count
+            self.stdout.write(
+                f"{username}: {counts['tasks']} 个任务, {counts['sessions']} 条番茄记录, {counts['moods']} 条心情"
+            )
+
+        # 批量写入不会触发信号，最后统一校准全站计数
+        reconcile_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"已生成 {len(usernames)} 个用户, {totals['tasks']} 个任务, "
+                f"{totals['sessions']} 条番茄记录与花园元素, {totals['moods']} 条心情"
+            )
+        )
+
+    @transaction.atomic
+    def seed_user(self, username, password, rng, options):
+        today = timezone.localdate()
+        first_day = today - timedelta(days=options["days"] - 1)
+        user = User.objects.create(username=username, password=password)
+        UserProfile.objects.create(user=user, nickname=f"演示用户{username[-4:]}", default_scene=rng.choice(SCENES))
+
+        tasks = Task.objects.bulk_create(
+            [
+                Task(
+                    user=user,
+                    title=f"任务 {number}",
+                    category=rng.choice(CATEGORIES),
+                    status=rng.choices(["todo", "doing", "done"], weights=[3, 1, 6])[0],
+                    priority=rng.choices(["normal", "important"], weights=[4, 1])[0],
+                    deadline=first_day + timedelta(days=rng.randrange(options["days"] + 30)) if rng.random() < 0.3 else None,
+                    is_today=rng.random() < 0.02,
+                    estimated_pomodoros=rng.randint(1, 8) if rng.random() < 0.5 else None,
+                )
+                for number in range(1, options["tasks"] + 1)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        session_count = 0
+        pending = []
+        moods = []
+        for offset in range(options["days"]):
+            day = first_day + timedelta(days=offset)
+            if rng.random() < options["mood_ratio"]:
+                moods.append(MoodRecord(user=user, date=day, mood=rng.randint(1, 5), note=rng.choice(["", "还不错", "有点累"])))
+            if rng.random() >= options["active_ratio"]:
+                continue
+            started = timezone.make_aware(datetime.combine(day, time(hour=rng.randint(7, 20), minute=rng.randrange(60))))
+            for _ in range(rng.randint(1, max(1, round(options["sessions_per_day"] * 2 - 1)))):
+                duration = rng.choice([15, 25, 25, 25, 30, 45, 50])
+                completed = rng.random() < 0.85
+                pending.append(
+                    FocusSession(
+                        user=user,
+                        task=rng.choice(tasks) if tasks and rng.random() < 0.8 else None,
+                        duration_minutes=Decimal(duration if completed else rng.randint(1, duration - 1)),
+                        is_completed=completed,
+                        interrupted_reason="" if completed else rng.choice(INTERRUPTED_REASONS),
+                        started_at=started,
+                        ended_at=started + timedelta(minutes=duration),
+                    )
+                )
+                started += timedelta(minutes=duration + rng.choice([5, 5, 10, 15]))
+            if len(pending) >= BATCH_SIZE:
+                session_count += self.write_sessions(pending)
+                pending = []
+        session_count += self.write_sessions(pending)
+        MoodRecord.objects.bulk_create(moods, batch_size=BATCH_SIZE)
+
+        rebuild_user_rollups(user)
+        return {"tasks": len(tasks), "sessions": session_count, "moods": len(moods)}
+
+    def write_sessions(self, sessions):
+        if not sessions:
+            return 0
+        sessions = FocusSession.objects.bulk_create(sessions, batch_size=BATCH_SIZE)
+        GardenItem.objects.bulk_create(
+            [GardenItem(session=session, **garden_item_fields(session)) for session in sessions], batch_size=BATCH_SIZE
+        )
+        return len(sessions)
@@ -0,0 +1,188 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in labels)
+
+
+class MetricsRegistry:
+    """进程内请求指标：按路由统计请求数、耗时直方图、错误数与 SQL 次数，单把锁保证多线程安全"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.in_flight = 0
+        self.requests = defaultdict(int)  # (method, route, status) -> 次数
+        self.errors = defaultdict(int)  # (method, route) -> 5xx 次数
+        self.queries = defaultdict(int)  # (method, route) -> SQL 总次数
+        # (method, route) -> [各桶计数（非累计）..., +Inf 桶, 耗时总和]
+        self.durations = {}
+
+    def start_request(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finish_request(self, method, route, status, seconds, query_count):
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(method, route, status)] += 1
+            if status >= 500:
+                self.errors[key] += 1
+            self.queries[key] += query_count
+            histogram = self.durations.get(key)
+            if histogram is None:
+                histogram = self.durations[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram[-1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.in_flight = 0
+            self.requests.clear()
+            self.errors.clear()
+            self.queries.clear()
+            self.durations.clear()
+
+    def render(self):
+        """Prometheus 文本格式（0.0.4）"""
+        with self._lock:
+            in_flight = self.in_flight
+            requests = dict(self.requests)
+            errors = dict(self.errors)
+            queries = dict(self.queries)
+            durations = {key: list(value) for key, value in self.durations.items()}
+
+        lines = [
+            "# HELP timegarden_process_start_time_seconds Start time of the process since unix epoch in seconds.",
+            "# TYPE timegarden_process_start_time_seconds gauge",
+            f"timegarden_process_start_time_seconds {self.started_at:.3f}",
+            "# HELP timegarden_http_requests_in_flight Requests currently being served.",
+            "# TYPE timegarden_http_requests_in_flight gauge",
+            f"timegarden_http_requests_in_flight {in_flight}",
+            "# HELP timegarden_http_requests_total Requests served, by route and status code.",
+            "# TYPE timegarden_http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(requests.items()):
+            labels = format_labels((("method", method), ("route", route), ("status", status)))
+            lines.append(f"timegarden_http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP timegarden_http_request_errors_total Requests that ended with a 5xx response.",
+            "# TYPE timegarden_http_request_errors_total counter",
+        ]
+        for (method, route), count in sorted(errors.items()):
+            labels = format_labels((("method", method), ("route", route)))
+            lines.append(f"timegarden_http_request_errors_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP timegarden_db_queries_total Database queries executed while serving requests.",
+            "# TYPE timegarden_db_queries_total counter",
+        ]
+        for (method, route), count in sorted(queries.items()):
+            labels = format_labels((("method", method), ("route", route)))
+            lines.append(f"timegarden_db_queries_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP timegarden_http_request_duration_seconds Request latency.",
+            "# TYPE timegarden_http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(durations.items()):
+            base = (("method", method), ("route", route))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), histogram[:-1]):
+                cumulative += count
+                labels = format_labels(base + (("le", bound if bound == "+Inf" else f"{bound:g}"),))
+                lines.append(f"timegarden_http_request_duration_seconds_bucket{{{labels}}} {cumulative}")
+            labels = format_labels(base)
+            lines.append(f"timegarden_http_request_duration_seconds_sum{{{labels}}} {histogram[-1]:.6f}")
+            lines.append(f"timegarden_http_request_duration_seconds_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(settings.TIMEGARDEN_METRICS_BUCKETS)
+
+
+class QueryCounter:
+    """当前请求的 SQL 次数"""
+
+    def __init__(self):
+        self.count = 0
+
+
+# 当前请求的 QueryCounter；上下文变量会随 sync_to_async 传入线程，异步视图中的查询同样计入
+current_counter = ContextVar("metrics_query_counter", default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    """常驻在每个数据库连接上的 execute_wrapper，只计数不计时，开销尽量小"""
+    counter = current_counter.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created 回调：为新建的数据库连接挂上 count_query"""
+    if count_query not in connection.execute_wrappers:
+        # 放在最前面：connection.execute_wrapper() 退出时弹出的是最后一个
+        connection.execute_wrappers.insert(0, count_query)
+
+
+class MetricsMiddleware:
+    """为 /api/admin/metrics/ 收集请求指标；路由标签使用 URL 模式而非实际路径，避免标签数量膨胀"""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        registry.start_request()
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            current_counter.reset(token)
+            self.finish_request(request, status, started, counter)
+
+    async def __acall__(self, request):
+        registry.start_request()
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            current_counter.reset(token)
+            self.finish_request(request, status, started, counter)
+
+    def finish_request(self, request, status, started, counter):
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match else "unmatched"
+        registry.finish_request(request.method, route, status, time.perf_counter() - started, counter.count)
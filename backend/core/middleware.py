@@ -0,0 +1,144 @@
+import contextvars
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger("timegarden.performance")
+
+TIMING_ATTR = "_server_timing"
+
+# 当前请求的 (计时字典, QueryRecorder)，供拿不到 request 的序列化器计时使用；_serializing 标记避免嵌套 .data 重复累加
+current_timings = contextvars.ContextVar("server_timing", default=None)
+_serializing = contextvars.ContextVar("server_timing_serializing", default=False)
+
+
+def add_timing(request, name, milliseconds):
+    """向当前请求累加一段计时；未启用计时中间件时忽略"""
+    timings = getattr(request, TIMING_ATTR, None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + milliseconds
+
+
+def timed_data(fget):
+    @wraps(fget)
+    def data(self):
+        current = current_timings.get()
+        if current is None or _serializing.get():
+            return fget(self)
+        timings, recorder = current
+        token = _serializing.set(True)
+        started = time.perf_counter()
+        sql_before = recorder.total_ms
+        try:
+            return fget(self)
+        finally:
+            _serializing.reset(token)
+            # 惰性 QuerySet 在序列化时才执行查询，这部分计入 sql 与 view，不计入 serialize
+            elapsed = (time.perf_counter() - started) * 1000 - (recorder.total_ms - sql_before)
+            timings["serialize"] = timings.get("serialize", 0.0) + elapsed
+
+    data.server_timing = True
+    return data
+
+
+def instrument_serializers():
+    """把序列化器 .data 的求值（to_representation，不含其间执行的 SQL）耗时计入 serialize 阶段；只包装一次"""
+    from rest_framework import serializers
+
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        prop = cls.__dict__["data"]
+        if not getattr(prop.fget, "server_timing", False):
+            cls.data = property(timed_data(prop.fget))
+
+
+class QueryRecorder:
+    """connection.execute_wrapper 回调：记录每条 SQL 及其耗时"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, duration in self.queries)
+
+
+def view_ms(timings, view_started, view_ended):
+    """视图耗时扣除其中序列化器的耗时（序列化单独作为 serialize 阶段输出）"""
+    return max((view_ended - view_started) * 1000 - timings.get("serialize", 0.0), 0.0)
+
+
+class ServerTimingMiddleware:
+    """记录每个请求的 SQL 次数与耗时、认证、视图、序列化与渲染耗时，写入 Server-Timing 响应头，超过阈值时记录慢请求日志。
+
+    view 为扣除 serialize 后的视图耗时（含 SQL），serialize 为序列化器 .data 求值中除 SQL 外的耗时，
+    render 为渲染器把数据编码为响应体的耗时。
+    通过 TIMEGARDEN_SERVER_TIMING=true 启用。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_serializers()
+
+    def __call__(self, request):
+        timings = {}
+        setattr(request, TIMING_ATTR, timings)
+        recorder = QueryRecorder()
+        token = current_timings.set((timings, recorder))
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = (time.perf_counter() - started) * 1000
+
+        view_started = getattr(request, "_server_timing_view_started", None)
+        if view_started is not None and "view" not in timings:
+            # 非模板响应（普通 HttpResponse）在返回时即视图结束
+            timings["view"] = view_ms(timings, view_started, time.perf_counter())
+        metrics = [f'sql;dur={recorder.total_ms:.1f};desc="{len(recorder.queries)} queries"']
+        metrics += [
+            f"{name};dur={timings[name]:.1f}" for name in ("auth", "view", "serialize", "render") if name in timings
+        ]
+        metrics.append(f"total;dur={total:.1f}")
+        response["Server-Timing"] = ", ".join(metrics)
+
+        if total >= settings.TIMEGARDEN_SLOW_REQUEST_MS or len(recorder.queries) >= settings.TIMEGARDEN_SLOW_REQUEST_QUERIES:
+            self.log_slow_request(request, response, total, recorder, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._server_timing_view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF Response 在此之后渲染：视图耗时到此为止，渲染耗时由渲染完成回调记录
+        now = time.perf_counter()
+        view_started = getattr(request, "_server_timing_view_started", now)
+        add_timing(request, "view", view_ms(getattr(request, TIMING_ATTR, {}), view_started, now))
+        response.add_post_render_callback(lambda rendered: add_timing(request, "render", (time.perf_counter() - now) * 1000))
+        return response
+
+    def log_slow_request(self, request, response, total, recorder, timings):
+        slowest = sorted(recorder.queries, key=lambda query: query[1], reverse=True)
+        lines = [f"  {duration:8.1f}ms  {sql}" for sql, duration in slowest[: settings.TIMEGARDEN_SLOW_REQUEST_SQL_LIMIT]]
+        logger.warning(
+            "慢请求 %s %s -> %s: total=%.1fms sql=%.1fms/%d queries %s\n%s",
+            request.method,
+            request.get_full_path(),
+            response.status_code,
+            total,
+            recorder.total_ms,
+            len(recorder.queries),
+            " ".join(f"{name}={value:.1f}ms" for name, value in timings.items()),
+            "\n".join(lines),
+        )
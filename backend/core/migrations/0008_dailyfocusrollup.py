@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:22
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_rollups(apps, schema_editor):
+    FocusSession = apps.get_model("core", "FocusSession")
+    DailyFocusRollup = apps.get_model("core", "DailyFocusRollup")
+    rollups = {}
+    sessions = FocusSession.objects.select_related("task").order_by("id").iterator(chunk_size=2000)
+    for session in sessions:
+        day = timezone.localdate(session.started_at or session.created_at)
+        rollup = rollups.get((session.user_id, day))
+        if rollup is None:
+            rollup = rollups[(session.user_id, day)] = DailyFocusRollup(
+                user_id=session.user_id, date=day, total_minutes=Decimal("0"), category_minutes=defaultdict(Decimal)
+            )
+        minutes = Decimal(session.duration_minutes or 0)
+        rollup.total_minutes += minutes
+        rollup.session_count += 1
+        if session.is_completed:
+            rollup.completed_count += 1
+        else:
+            rollup.aborted_count += 1
+        if session.task_id:
+            rollup.category_minutes[session.task.category or ""] += minutes
+    for rollup in rollups.values():
+        rollup.category_minutes = {name: str(minutes) for name, minutes in rollup.category_minutes.items()}
+    DailyFocusRollup.objects.bulk_create(rollups.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_configure_ambient_sounds'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFocusRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_minutes', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('session_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('aborted_count', models.IntegerField(default=0)),
+                ('category_minutes', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='focus_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
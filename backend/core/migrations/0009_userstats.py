@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:23
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_streaks(apps, schema_editor):
+    DailyFocusRollup = apps.get_model("core", "DailyFocusRollup")
+    UserStats = apps.get_model("core", "UserStats")
+    streaks = {}
+    rollups = DailyFocusRollup.objects.filter(session_count__gt=0).order_by("user_id", "date")
+    for user_id, day in rollups.values_list("user_id", "date").iterator():
+        stats = streaks.get(user_id)
+        if stats is None:
+            stats = streaks[user_id] = UserStats(user_id=user_id, current_streak=0, longest_streak=0)
+        if stats.last_active_date == day - timedelta(days=1):
+            stats.current_streak += 1
+        else:
+            stats.current_streak = 1
+        stats.longest_streak = max(stats.longest_streak, stats.current_streak)
+        stats.last_active_date = day
+    UserStats.objects.bulk_create(streaks.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_dailyfocusrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('current_streak', models.IntegerField(default=0)),
+                ('longest_streak', models.IntegerField(default=0)),
+                ('last_active_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(populate_streaks, migrations.RunPython.noop),
+    ]
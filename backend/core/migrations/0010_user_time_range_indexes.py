@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_userstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='focussession',
+            index=models.Index(fields=['user', 'created_at'], name='session_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='focussession',
+            index=models.Index(fields=['user', 'started_at'], name='session_user_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gardenitem',
+            index=models.Index(fields=['user', 'date', 'category', 'is_dead'], name='garden_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'created_at'], name='task_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status'], name='task_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'is_today'], name='task_user_today_idx'),
+        ),
+    ]
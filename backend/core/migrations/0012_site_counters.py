@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_counters(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Task = apps.get_model("core", "Task")
+    UserProfile = apps.get_model("core", "UserProfile")
+    UserStats = apps.get_model("core", "UserStats")
+    DailyFocusRollup = apps.get_model("core", "DailyFocusRollup")
+    SiteCounter = apps.get_model("core", "SiteCounter")
+    SiteDailyRollup = apps.get_model("core", "SiteDailyRollup")
+
+    has_plan = set(Task.objects.filter(is_today=True).values_list("user_id", flat=True).distinct())
+    UserStats.objects.filter(user_id__in=has_plan).update(has_today_plan=True)
+    existing = set(UserStats.objects.filter(user_id__in=has_plan).values_list("user_id", flat=True))
+    UserStats.objects.bulk_create([UserStats(user_id=user_id, has_today_plan=True) for user_id in has_plan - existing])
+
+    totals = DailyFocusRollup.objects.aggregate(minutes=Sum("total_minutes"), sessions=Sum("session_count"))
+    values = {
+        "users": User.objects.count(),
+        "focus_minutes": totals["minutes"] or 0,
+        "focus_sessions": totals["sessions"] or 0,
+        "today_plan_users": len(has_plan),
+    }
+    for entry in UserProfile.objects.values("default_scene").annotate(count=Count("id")):
+        values[f"scene:{entry['default_scene']}"] = entry["count"]
+    SiteCounter.objects.bulk_create([SiteCounter(name=name, value=value) for name, value in values.items()])
+
+    daily = DailyFocusRollup.objects.values("date").annotate(minutes=Sum("total_minutes"), sessions=Sum("session_count"))
+    SiteDailyRollup.objects.bulk_create(
+        [SiteDailyRollup(date=row["date"], total_minutes=row["minutes"], session_count=row["sessions"]) for row in daily],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_task_moodrecord_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SiteDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('total_minutes', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('session_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='userstats',
+            name='has_today_plan',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:31
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_user_totals(apps, schema_editor):
+    DailyFocusRollup = apps.get_model("core", "DailyFocusRollup")
+    UserStats = apps.get_model("core", "UserStats")
+    user_rollups = DailyFocusRollup.objects.filter(user=OuterRef("user")).values("user")
+    UserStats.objects.update(
+        total_focus_minutes=Coalesce(Subquery(user_rollups.annotate(total=Sum("total_minutes")).values("total")), 0),
+        total_sessions=Coalesce(Subquery(user_rollups.annotate(total=Sum("session_count")).values("total")), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_site_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstats',
+            name='total_focus_minutes',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='userstats',
+            name='total_sessions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['nickname'], name='profile_nickname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userstats',
+            index=models.Index(fields=['total_focus_minutes'], name='userstats_minutes_idx'),
+        ),
+        migrations.RunPython(populate_user_totals, migrations.RunPython.noop),
+    ]
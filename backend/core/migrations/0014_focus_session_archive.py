@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_admin_user_list'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FocusSessionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.IntegerField(unique=True)),
+                ('garden_item_id', models.IntegerField(blank=True, null=True)),
+                ('task_id', models.IntegerField(blank=True, null=True)),
+                ('date', models.DateField()),
+                ('duration_minutes', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('is_completed', models.BooleanField(default=True)),
+                ('interrupted_reason', models.CharField(blank=True, max_length=200)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('garden_date', models.DateField(blank=True, null=True)),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('item_type', models.CharField(blank=True, max_length=50)),
+                ('is_dead', models.BooleanField(default=False)),
+                ('garden_created_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'date'], name='archive_user_date_idx'), models.Index(fields=['user', 'garden_date', 'category', 'is_dead'], name='archive_user_garden_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_missing_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Task = apps.get_model("core", "Task")
+    UserStats = apps.get_model("core", "UserStats")
+    has_plan = set(Task.objects.filter(is_today=True).values_list("user_id", flat=True))
+    missing = User.objects.filter(stats__isnull=True).values_list("id", flat=True)
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=user_id, has_today_plan=user_id in has_plan) for user_id in missing],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_focus_session_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='userstats',
+            name='userstats_minutes_idx',
+        ),
+        migrations.AddIndex(
+            model_name='userstats',
+            index=models.Index(fields=['total_focus_minutes', 'user'], name='userstats_minutes_user_idx'),
+        ),
+        migrations.RunPython(create_missing_stats, migrations.RunPython.noop),
+    ]
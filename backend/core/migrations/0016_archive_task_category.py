@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:15
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_task_category(apps, schema_editor):
+    FocusSessionArchive = apps.get_model("core", "FocusSessionArchive")
+    Task = apps.get_model("core", "Task")
+    archived = FocusSessionArchive.objects.filter(task_id__isnull=False)
+    # 任务已删除的归档记录不再关联任务
+    archived.exclude(task_id__in=Task.objects.values("id")).update(task_id=None)
+    archived.update(task_category=Subquery(Task.objects.filter(id=OuterRef("task_id")).values("category")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_userstats_for_every_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='focussessionarchive',
+            name='task_category',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(fill_task_category, migrations.RunPython.noop),
+    ]
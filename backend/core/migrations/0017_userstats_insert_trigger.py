@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_archive_task_category'),
+    ]
+
+    operations = [
+        # 管理员用户列表按 UserStats 内连接排序：新用户写入时由触发器补上统计行，
+        # bulk_create 或直接写库创建的用户也不会从列表与导出中消失
+        migrations.RunSQL(
+            sql="""
+                CREATE TRIGGER core_userstats_for_new_user AFTER INSERT ON auth_user
+                BEGIN
+                    INSERT OR IGNORE INTO core_userstats
+                        (user_id, current_streak, longest_streak, last_active_date, has_today_plan,
+                         total_focus_minutes, total_sessions, updated_at)
+                    VALUES (NEW.id, 0, 0, NULL, 0, 0, 0, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+                END
+            """,
+            reverse_sql="DROP TRIGGER IF EXISTS core_userstats_for_new_user",
+        ),
+    ]
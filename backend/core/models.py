@@ -25,6 +25,11 @@ class UserProfile(models.Model):
     default_long_break_minutes = models.IntegerField(default=15)
     default_scene = models.CharField(max_length=50, default="rain")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["nickname"], name="profile_nickname_idx"),
+        ]
+
     def __str__(self):
         return self.nickname or self.user.username
 
@@ -54,6 +59,14 @@ class Task(models.Model):
     is_today = models.BooleanField(default=False)
     estimated_pomodoros = models.IntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="task_user_created_idx"),
+            models.Index(fields=["user", "status"], name="task_user_status_idx"),
+            models.Index(fields=["user", "is_today"], name="task_user_today_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -71,10 +84,82 @@ class FocusSession(models.Model):
     ended_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="session_user_created_idx"),
+            models.Index(fields=["user", "started_at"], name="session_user_started_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.duration_minutes}m"
 
 
+class DailyFocusRollup(models.Model):
+    """按用户、本地日期汇总的专注数据，随专注记录写入增量维护"""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="focus_rollups")
+    date = models.DateField()
+    total_minutes = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    session_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    aborted_count = models.IntegerField(default=0)
+    # 分类 -> 分钟数（字符串形式的 Decimal），仅统计关联了任务的专注记录
+    category_minutes = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("user", "date")
+
+    def __str__(self):
+        return f"{self.user.username} {self.date} {self.total_minutes}m"
+
+
+class UserStats(models.Model):
+    """用户级别的专注统计快照（连续天数等），随专注记录写入增量维护"""
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="stats")
+    current_streak = models.IntegerField(default=0)
+    longest_streak = models.IntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
+    # 是否有加入今日计划的任务，用于维护全站 today_plan_users 计数
+    has_today_plan = models.BooleanField(default=False)
+    total_focus_minutes = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_sessions = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # 管理员用户列表按累计专注时长排序（含 user 作为同值时的次序），每个用户都有一行 UserStats
+            models.Index(fields=["total_focus_minutes", "user"], name="userstats_minutes_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} streak={self.current_streak}"
+
+
+class SiteCounter(models.Model):
+    """全站累计计数器，随写入事务增量更新，可用 reconcile_site_counters 校准"""
+
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}={self.value}"
+
+
+class SiteDailyRollup(models.Model):
+    """全站按本地日期汇总的专注数据"""
+
+    date = models.DateField(unique=True)
+    total_minutes = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    session_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.date} {self.total_minutes}m"
+
+
 class GardenItem(models.Model):
     """花园可视化条目"""
 
@@ -88,11 +173,50 @@ class GardenItem(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # 同时覆盖花园汇总接口按日期/分类/枯萎状态的分组统计
+            models.Index(fields=["user", "date", "category", "is_dead"], name="garden_user_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.item_type} - {self.date}"
 
 
+class FocusSessionArchive(models.Model):
+    """归档的历史专注记录（连同其花园条目压缩为一行），由 archive_focus_sessions 从热表迁入，只读"""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_sessions")
+    # 原 FocusSession / GardenItem / Task 的主键，不再作为外键约束
+    session_id = models.IntegerField(unique=True)
+    garden_item_id = models.IntegerField(null=True, blank=True)
+    task_id = models.IntegerField(null=True, blank=True)
+    # 关联任务的当前分类，计入日汇总的分类时长；随任务分类修改同步，任务删除后 task_id 置空
+    task_category = models.CharField(max_length=100, blank=True)
+    # 专注记录所属的本地日期，用于重建日汇总
+    date = models.DateField()
+    duration_minutes = models.DecimalField(max_digits=6, decimal_places=2)
+    is_completed = models.BooleanField(default=True)
+    interrupted_reason = models.CharField(max_length=200, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    # 花园条目字段（category 为花园条目自身的分类，只用于花园列表/汇总）；没有花园条目时 garden_date 为空
+    garden_date = models.DateField(null=True, blank=True)
+    category = models.CharField(max_length=100, blank=True)
+    item_type = models.CharField(max_length=50, blank=True)
+    is_dead = models.BooleanField(default=False)
+    garden_created_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "date"], name="archive_user_date_idx"),
+            models.Index(fields=["user", "garden_date", "category", "is_dead"], name="archive_user_garden_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} {self.date} {self.duration_minutes}m (archived)"
+
+
 class MoodRecord(models.Model):
     """情绪/日记记录"""
 
@@ -100,6 +224,7 @@ class MoodRecord(models.Model):
     date = models.DateField(default=timezone.now)
     mood = models.IntegerField()
     note = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("user", "date")
@@ -0,0 +1,23 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """按 (-created_at, -id) 的游标分页，仅当请求携带 cursor 或 page_size 时启用"""
+
+    ordering = ("-created_at", "-id")
+    page_size = settings.TIMEGARDEN_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.TIMEGARDEN_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class AdminUserPagination(PageNumberPagination):
+    page_size = settings.TIMEGARDEN_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.TIMEGARDEN_MAX_PAGE_SIZE
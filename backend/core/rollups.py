@@ -0,0 +1,265 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import bump_data_version
+from .counters import apply_focus_deltas
+from .models import DailyFocusRollup, FocusSession, FocusSessionArchive, UserStats
+
+ONE_DAY = timedelta(days=1)
+
+
+def session_local_date(session):
+    """专注记录所属的本地日期，优先取开始时间，兼容离线补录"""
+    moment = session.started_at or session.created_at or timezone.now()
+    return timezone.localdate(moment)
+
+
+def local_day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+    return start, start + timedelta(days=1)
+
+
+def _new_bucket():
+    return {
+        "total_minutes": Decimal("0"),
+        "session_count": 0,
+        "completed_count": 0,
+        "aborted_count": 0,
+        "category_minutes": defaultdict(Decimal),
+    }
+
+
+def _add_to_bucket(bucket, duration_minutes, is_completed, category):
+    minutes = Decimal(duration_minutes or 0)
+    bucket["total_minutes"] += minutes
+    bucket["session_count"] += 1
+    if is_completed:
+        bucket["completed_count"] += 1
+    else:
+        bucket["aborted_count"] += 1
+    if category is not None:
+        bucket["category_minutes"][category] += minutes
+
+
+def bucket_sessions(sessions, archived=()):
+    """按本地日期汇总一批专注记录（可附带归档记录），返回 {date: bucket}"""
+    buckets = defaultdict(_new_bucket)
+    for session in sessions:
+        category = (session.task.category or "") if session.task_id else None
+        _add_to_bucket(buckets[session_local_date(session)], session.duration_minutes, session.is_completed, category)
+    for row in archived:
+        category = row.task_category if row.task_id else None
+        _add_to_bucket(buckets[row.date], row.duration_minutes, row.is_completed, category)
+    return buckets
+
+
+def _serialize_categories(categories):
+    return {name: str(minutes) for name, minutes in categories.items()}
+
+
+@transaction.atomic
+def record_sessions(user, sessions):
+    """将新写入的专注记录累加到日汇总表并更新连续天数，返回受影响的日期"""
+    buckets = bucket_sessions(sessions)
+    new_active_days = set()
+    for day, bucket in buckets.items():
+        rollup, _ = DailyFocusRollup.objects.select_for_update().get_or_create(user=user, date=day)
+        if rollup.session_count == 0:
+            new_active_days.add(day)
+        rollup.total_minutes += bucket["total_minutes"]
+        rollup.session_count += bucket["session_count"]
+        rollup.completed_count += bucket["completed_count"]
+        rollup.aborted_count += bucket["aborted_count"]
+        categories = dict(rollup.category_minutes)
+        for name, minutes in bucket["category_minutes"].items():
+            categories[name] = str(Decimal(categories.get(name, "0")) + minutes)
+        rollup.category_minutes = categories
+        rollup.save()
+    if new_active_days:
+        extend_streak(user, new_active_days)
+    deltas = {day: (bucket["total_minutes"], bucket["session_count"]) for day, bucket in buckets.items()}
+    add_user_totals(user, deltas)
+    apply_focus_deltas(deltas)
+    return set(buckets)
+
+
+def add_user_totals(user, deltas):
+    """把 {date: (minutes, sessions)} 的变化累加到用户累计专注时长与次数"""
+    minutes = sum((delta[0] for delta in deltas.values()), Decimal("0"))
+    sessions = sum(delta[1] for delta in deltas.values())
+    if not minutes and not sessions:
+        return
+    UserStats.objects.get_or_create(user=user)
+    UserStats.objects.filter(user=user).update(
+        total_focus_minutes=F("total_focus_minutes") + minutes,
+        total_sessions=F("total_sessions") + sessions,
+    )
+
+
+def sessions_on_days(user, days):
+    condition = Q()
+    for day in days:
+        start, end = local_day_bounds(day)
+        condition |= Q(started_at__gte=start, started_at__lt=end)
+        condition |= Q(started_at__isnull=True, created_at__gte=start, created_at__lt=end)
+    return FocusSession.objects.filter(condition, user=user).select_related("task")
+
+
+def task_session_days(user, task_ids):
+    """关联到指定任务的专注记录（含归档记录）所在的本地日期；任务分类修改或删除后需重算这些日期的分类时长"""
+    sessions = FocusSession.objects.filter(user=user, task_id__in=task_ids).only("started_at", "created_at")
+    days = {session_local_date(session) for session in sessions.iterator(chunk_size=2000)}
+    archived = FocusSessionArchive.objects.filter(user=user, task_id__in=task_ids)
+    return days | set(archived.values_list("date", flat=True).distinct())
+
+
+@transaction.atomic
+def rebuild_daily_rollups(user, days):
+    """按原始记录（含归档记录）重算指定日期的汇总，用于修改/删除专注记录之后"""
+    days = set(days)
+    if not days:
+        return set()
+    previous = {
+        rollup.date: (rollup.total_minutes, rollup.session_count)
+        for rollup in DailyFocusRollup.objects.filter(user=user, date__in=days)
+    }
+    archived = FocusSessionArchive.objects.filter(user=user, date__in=days)
+    buckets = bucket_sessions(sessions_on_days(user, days), archived)
+    deltas = {}
+    for day in days:
+        bucket = buckets.get(day)
+        old_minutes, old_sessions = previous.get(day, (Decimal("0"), 0))
+        if not bucket:
+            deltas[day] = (-old_minutes, -old_sessions)
+            DailyFocusRollup.objects.filter(user=user, date=day).delete()
+            continue
+        deltas[day] = (bucket["total_minutes"] - old_minutes, bucket["session_count"] - old_sessions)
+        DailyFocusRollup.objects.update_or_create(
+            user=user,
+            date=day,
+            defaults={
+                "total_minutes": bucket["total_minutes"],
+                "session_count": bucket["session_count"],
+                "completed_count": bucket["completed_count"],
+                "aborted_count": bucket["aborted_count"],
+                "category_minutes": _serialize_categories(bucket["category_minutes"]),
+            },
+        )
+    add_user_totals(user, deltas)
+    apply_focus_deltas(deltas)
+    rebuild_streak(user)
+    return days
+
+
+@transaction.atomic
+def rebuild_user_rollups(user):
+    """丢弃并重建某个用户的全部日汇总（不调整全站计数，需随后执行 reconcile_site_counters）"""
+    sessions = FocusSession.objects.filter(user=user).select_related("task").iterator(chunk_size=2000)
+    archived = FocusSessionArchive.objects.filter(user=user).iterator(chunk_size=2000)
+    buckets = bucket_sessions(sessions, archived)
+    DailyFocusRollup.objects.filter(user=user).delete()
+    DailyFocusRollup.objects.bulk_create(
+        [
+            DailyFocusRollup(
+                user=user,
+                date=day,
+                total_minutes=bucket["total_minutes"],
+                session_count=bucket["session_count"],
+                completed_count=bucket["completed_count"],
+                aborted_count=bucket["aborted_count"],
+                category_minutes=_serialize_categories(bucket["category_minutes"]),
+            )
+            for day, bucket in buckets.items()
+        ],
+        batch_size=500,
+    )
+    UserStats.objects.update_or_create(
+        user=user,
+        defaults={
+            "total_focus_minutes": sum((bucket["total_minutes"] for bucket in buckets.values()), Decimal("0")),
+            "total_sessions": sum(bucket["session_count"] for bucket in buckets.values()),
+        },
+    )
+    rebuild_streak(user)
+    # 汇总表不触发缓存版本信号，手动使该用户的统计缓存失效
+    bump_data_version(user.id)
+    return len(buckets)
+
+
+def _active_dates(user):
+    return DailyFocusRollup.objects.filter(user=user, session_count__gt=0).values_list("date", flat=True)
+
+
+def _count_adjacent_days(dates, day, step):
+    count = 0
+    expected = day + step
+    for active in dates.iterator():
+        if active != expected:
+            break
+        count += 1
+        expected += step
+    return count
+
+
+@transaction.atomic
+def extend_streak(user, new_active_days):
+    """新增活跃日期后增量更新连续天数；补录到历史日期时只重算该日期所在的连续区间"""
+    stats, _ = UserStats.objects.select_for_update().get_or_create(user=user)
+    for day in sorted(new_active_days):
+        last = stats.last_active_date
+        if last is None or day > last:
+            stats.current_streak = stats.current_streak + 1 if last == day - ONE_DAY else 1
+            stats.last_active_date = day
+            run = stats.current_streak
+        elif day == last:
+            continue
+        else:
+            before = _count_adjacent_days(_active_dates(user).filter(date__lt=day).order_by("-date"), day, -ONE_DAY)
+            # 只统计到 last 为止：同批次中更晚的日期已写入汇总表，但要等随后按顺序处理时再延长连续天数
+            after = _count_adjacent_days(
+                _active_dates(user).filter(date__gt=day, date__lte=last).order_by("date"), day, ONE_DAY
+            )
+            run = before + 1 + after
+            if day + after * ONE_DAY == last:
+                stats.current_streak = run
+        stats.longest_streak = max(stats.longest_streak, run)
+    stats.save()
+    return stats
+
+
+@transaction.atomic
+def rebuild_streak(user):
+    """按日汇总表完整重算连续天数"""
+    current = longest = 0
+    last = None
+    for day in _active_dates(user).order_by("date").iterator():
+        current = current + 1 if last == day - ONE_DAY else 1
+        longest = max(longest, current)
+        last = day
+    stats, _ = UserStats.objects.update_or_create(
+        user=user,
+        defaults={"current_streak": current, "longest_streak": longest, "last_active_date": last},
+    )
+    return stats
+
+
+def streak_days(user, today=None):
+    """截至今天（本地日期）的连续专注天数，今天尚未专注则为 0"""
+    today = today or timezone.localdate()
+    stats = UserStats.objects.filter(user=user).first()
+    if stats and stats.last_active_date == today:
+        return stats.current_streak
+    return 0
+
+
+async def astreak_days(user, today=None):
+    today = today or timezone.localdate()
+    stats = await UserStats.objects.filter(user=user).afirst()
+    if stats and stats.last_active_date == today:
+        return stats.current_streak
+    return 0
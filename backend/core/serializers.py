@@ -1,7 +1,17 @@
+from django.conf import settings
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
-from .models import AmbientSound, Announcement, FocusSession, GardenItem, MoodRecord, Task, UserProfile
+from .models import (
+    AmbientSound,
+    Announcement,
+    FocusSession,
+    FocusSessionArchive,
+    GardenItem,
+    MoodRecord,
+    Task,
+    UserProfile,
+)
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -48,6 +58,27 @@ class TaskSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+class TaskBulkUpdateSerializer(serializers.Serializer):
+    """批量修改任务：对 ids 中属于当前用户的任务统一设置给出的字段"""
+
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    is_today = serializers.BooleanField(required=False)
+    priority = serializers.ChoiceField(choices=Task._meta.get_field("priority").choices, required=False)
+    category = serializers.CharField(max_length=100, allow_blank=True, required=False)
+
+    def validate_ids(self, value):
+        limit = settings.TIMEGARDEN_BULK_TASK_LIMIT
+        if len(value) > limit:
+            raise serializers.ValidationError(f"单次最多修改 {limit} 个任务")
+        return list(dict.fromkeys(value))
+
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError("至少需要指定 status、is_today、priority、category 之一")
+        return attrs
+
+
 class FocusSessionSerializer(serializers.ModelSerializer):
     class Meta:
         model = FocusSession
@@ -64,6 +95,20 @@ class FocusSessionSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+class FocusSessionBulkItemSerializer(FocusSessionSerializer):
+    """批量写入中的单条记录，任务从预先加载的当前用户任务中解析"""
+
+    task = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate_task(self, value):
+        if value is None:
+            return None
+        task = self.context["tasks"].get(value)
+        if task is None:
+            raise serializers.ValidationError("任务不存在")
+        return task
+
+
 class MoodRecordSerializer(serializers.ModelSerializer):
     class Meta:
         model = MoodRecord
@@ -84,16 +129,27 @@ class MoodRecordSerializer(serializers.ModelSerializer):
         )[0]
 
 
+class TodayStatsSerializer(serializers.Serializer):
+    today_minutes = serializers.DecimalField(max_digits=8, decimal_places=2)
+    today_sessions = serializers.IntegerField()
+    streak_days = serializers.IntegerField()
+
+
 class GardenViewSerializer(serializers.Serializer):
     total_sessions = serializers.IntegerField()
     completed_count = serializers.IntegerField()
     aborted_count = serializers.IntegerField()
     streak_days = serializers.IntegerField(required=False)
     today_focus_minutes = serializers.DecimalField(required=False, max_digits=8, decimal_places=2)
+    range = serializers.CharField(required=False)
+    period_sessions = serializers.IntegerField(required=False)
+    period_completed = serializers.IntegerField(required=False)
+    period_aborted = serializers.IntegerField(required=False)
+    period_minutes = serializers.DecimalField(required=False, max_digits=10, decimal_places=2)
 
 
 class GardenItemSerializer(serializers.ModelSerializer):
-    session_id = serializers.IntegerField(source="session.id", read_only=True)
+    session_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = GardenItem
@@ -108,6 +164,26 @@ class GardenItemSerializer(serializers.ModelSerializer):
         ]
 
 
+class ArchivedGardenItemSerializer(serializers.ModelSerializer):
+    """归档记录按花园条目的字段输出，与 GardenItemSerializer 结构一致"""
+
+    id = serializers.IntegerField(source="garden_item_id", read_only=True)
+    date = serializers.DateField(source="garden_date", read_only=True)
+    created_at = serializers.DateTimeField(source="garden_created_at", read_only=True)
+
+    class Meta:
+        model = FocusSessionArchive
+        fields = [
+            "id",
+            "date",
+            "category",
+            "item_type",
+            "is_dead",
+            "session_id",
+            "created_at",
+        ]
+
+
 class AnnouncementSerializer(serializers.ModelSerializer):
     class Meta:
         model = Announcement
@@ -118,7 +194,7 @@ class AnnouncementSerializer(serializers.ModelSerializer):
 class AdminUserSerializer(serializers.ModelSerializer):
     nickname = serializers.CharField(source="profile.nickname", read_only=True)
     role = serializers.CharField(source="profile.role", read_only=True)
-    total_focus_minutes = serializers.DecimalField(read_only=True, max_digits=8, decimal_places=2)
+    total_focus_minutes = serializers.DecimalField(read_only=True, max_digits=12, decimal_places=2)
     total_sessions = serializers.IntegerField(read_only=True)
 
     class Meta:
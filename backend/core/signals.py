@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.db import transaction
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .cache import bump_data_version
+from .counters import USERS, add_to_counter, forget_user, refresh_today_plan, scene_counter
+from .models import AmbientSound, FocusSession, GardenItem, MoodRecord, Task, UserProfile
+from .sounds import sound_manifest
+
+
+@receiver(post_save, sender=FocusSession)
+@receiver(post_delete, sender=FocusSession)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=GardenItem)
+@receiver(post_delete, sender=GardenItem)
+@receiver(post_save, sender=MoodRecord)
+@receiver(post_delete, sender=MoodRecord)
+def invalidate_user_cache(sender, instance, **kwargs):
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Token)
+def evict_cached_token(sender, instance, **kwargs):
+    token_cache.discard(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    token_cache.discard_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def evict_cached_profile(sender, instance, **kwargs):
+    token_cache.discard_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def count_new_user(sender, instance, created, **kwargs):
+    if created:
+        add_to_counter(USERS, 1)
+
+
+@receiver(pre_delete, sender=User)
+def discount_deleted_user(sender, instance, **kwargs):
+    forget_user(instance)
+    add_to_counter(USERS, -1)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def update_today_plan(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, User) or getattr(origin, "model", None) is User:
+        # 用户整体删除（单个或 QuerySet 批量删除）时由 discount_deleted_user 统一处理
+        return
+    refresh_today_plan(instance.user_id)
+
+
+@receiver(pre_save, sender=UserProfile)
+def remember_previous_scene(sender, instance, **kwargs):
+    instance._previous_scene = (
+        UserProfile.objects.filter(pk=instance.pk).values_list("default_scene", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=UserProfile)
+def count_profile_scene(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_scene", None)
+    if previous == instance.default_scene:
+        return
+    if previous is not None:
+        add_to_counter(scene_counter(previous), -1)
+    add_to_counter(scene_counter(instance.default_scene), 1)
+
+
+@receiver(post_delete, sender=UserProfile)
+def discount_profile_scene(sender, instance, **kwargs):
+    add_to_counter(scene_counter(instance.default_scene), -1)
+
+
+@receiver(post_save, sender=AmbientSound)
+@receiver(post_delete, sender=AmbientSound)
+def invalidate_sound_manifest(sender, instance, **kwargs):
+    transaction.on_commit(sound_manifest.invalidate)
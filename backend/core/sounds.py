@@ -0,0 +1,80 @@
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+
+def sound_file_candidates(sound):
+    """音频文件可能的本地路径：先上传文件，再站内 file_url"""
+    if sound.file:
+        yield Path(sound.file.path)
+    media_url = settings.MEDIA_URL or "/media/"
+    if sound.file_url and sound.file_url.startswith(media_url):
+        yield Path(settings.MEDIA_ROOT) / sound.file_url.replace(media_url, "").lstrip("/")
+
+
+def directory_mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+class SoundManifest:
+    """已发布且音频文件存在的环境音列表的进程内缓存。
+
+    AmbientSound 写入时由信号失效；文件增删通过所在目录的 mtime 发现，
+    目录检查按 check_interval 节流，两次检查之间请求完全不访问磁盘。
+    """
+
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._sounds = None
+        self._mtimes = {}
+        self._checked_at = 0.0
+        self._generation = 0
+
+    def get(self, queryset):
+        with self._lock:
+            if self._sounds is not None and not self._directories_changed():
+                return self._sounds
+            generation = self._generation
+        sounds, mtimes = self._build(queryset)
+        with self._lock:
+            # 构建期间若已被失效，本次结果仍返回但不写入缓存
+            if generation == self._generation:
+                self._sounds = sounds
+                self._mtimes = mtimes
+                self._checked_at = time.monotonic()
+        return sounds
+
+    def invalidate(self):
+        with self._lock:
+            self._sounds = None
+            self._generation += 1
+
+    def _directories_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return any(directory_mtime(path) != mtime for path, mtime in self._mtimes.items())
+
+    def _build(self, queryset):
+        sounds = []
+        directories = {Path(settings.MEDIA_ROOT) / "sounds"}
+        for sound in queryset:
+            if sound.key == "none":
+                sounds.append(sound)
+                continue
+            for path in sound_file_candidates(sound):
+                directories.add(path.parent)
+                if path.exists():
+                    sounds.append(sound)
+                    break
+        return sounds, {path: directory_mtime(path) for path in directories}
+
+
+sound_manifest = SoundManifest(settings.TIMEGARDEN_SOUND_MANIFEST_CHECK_INTERVAL)
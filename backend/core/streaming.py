@@ -0,0 +1,33 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+# ASGI 下每次在线程中从同步迭代器拉取的字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def read_chunk(parts, size):
+    """从字节迭代器中读取约 size 字节，迭代结束时返回空字节串"""
+    chunk = []
+    total = 0
+    for part in parts:
+        chunk.append(part)
+        total += len(part)
+        if total >= size:
+            break
+    return b"".join(chunk)
+
+
+async def aiter_chunks(parts, size=STREAM_CHUNK_SIZE):
+    # 与视图在同一线程中读取，数据库游标不会跨线程使用
+    read = sync_to_async(read_chunk, thread_sensitive=True)
+    while chunk := await read(parts, size):
+        yield chunk
+
+
+def stream_async(request, response):
+    """ASGI 请求的同步流式响应改为异步迭代，分块发送；否则 Django 会先把整个响应体读入内存"""
+    request = getattr(request, "_request", request)
+    if isinstance(request, ASGIRequest) and response.streaming and not response.is_async:
+        # 迭代器关闭仍由 response.close() 负责（文件句柄、数据库游标）
+        response.streaming_content = aiter_chunks(response.streaming_content)
+    return response
@@ -0,0 +1,380 @@
+import csv
+import io
+import os
+import re
+import tempfile
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from waitress.buffers import ReadOnlyFileBasedBuffer
+from rest_framework.test import APIClient
+
+from .metrics import MetricsMiddleware, registry
+from .models import DailyFocusRollup, FocusSession, FocusSessionArchive, GardenItem, MoodRecord, Task, UserProfile, UserStats
+from .rollups import rebuild_streak
+
+
+class StreakTests(TestCase):
+    """增量维护的连续天数应与按日汇总表完整重算的结果一致"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = timezone.localdate()
+
+    def session(self, days_ago):
+        day = self.today - timedelta(days=days_ago)
+        started_at = timezone.make_aware(datetime.combine(day, time(9)), timezone.get_current_timezone())
+        return {"duration_minutes": 25, "started_at": started_at.isoformat()}
+
+    def post_bulk(self, *days_ago):
+        response = self.client.post(
+            "/api/sessions/bulk/", {"sessions": [self.session(days) for days in days_ago]}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def assertMatchesRebuild(self, current, longest):
+        stats = UserStats.objects.get(user=self.user)
+        incremental = (stats.current_streak, stats.longest_streak, stats.last_active_date)
+        rebuilt = rebuild_streak(self.user)
+        self.assertEqual(incremental, (rebuilt.current_streak, rebuilt.longest_streak, rebuilt.last_active_date))
+        self.assertEqual(incremental[:2], (current, longest))
+
+    def test_batch_with_backdated_and_later_days(self):
+        self.post_bulk(1)
+        self.post_bulk(2, 0)
+        self.assertMatchesRebuild(3, 3)
+
+    def test_backfill_joins_two_runs(self):
+        self.post_bulk(5, 4, 2, 1, 0)
+        self.post_bulk(3)
+        self.assertMatchesRebuild(6, 6)
+
+    def test_backfill_before_gap_keeps_current_streak(self):
+        self.post_bulk(1, 0)
+        self.post_bulk(6, 4, 5)
+        self.assertMatchesRebuild(2, 3)
+
+
+class QueryPlanTests(TestCase):
+    """用户维度的接口查询应走 (user, ...) 复合索引，不能对专注/任务等热表做全表扫描"""
+
+    HOT_TABLES = ("core_task", "core_focussession", "core_gardenitem", "core_moodrecord", "core_dailyfocusrollup")
+    ENDPOINTS = (
+        "/api/tasks/",
+        "/api/tasks/?status=done",
+        "/api/tasks/?is_today=true",
+        "/api/tasks/?page_size=5",
+        "/api/sessions/",
+        "/api/sessions/?page_size=5",
+        "/api/dashboard/",
+        "/api/stats/today/",
+        "/api/stats/overview/?days=30",
+        "/api/moods/today/",
+        "/api/moods/recent/",
+        "/api/garden/overview/?range=month",
+        "/api/garden/items/?range=month",
+        "/api/garden/items/summary/?range=month",
+        "/api/export/",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        for name in ("alice", "bob"):
+            user = User.objects.create_user(username=name, password="pw")
+            tasks = Task.objects.bulk_create(
+                [
+                    Task(user=user, title=f"任务 {index}", status="done" if index % 3 == 0 else "todo", is_today=index % 4 == 0)
+                    for index in range(20)
+                ]
+            )
+            sessions = FocusSession.objects.bulk_create(
+                [FocusSession(user=user, task=tasks[index], duration_minutes=25) for index in range(20)]
+            )
+            GardenItem.objects.bulk_create(
+                [GardenItem(user=user, session=session, date=today, category="学习") for session in sessions]
+            )
+            MoodRecord.objects.bulk_create(
+                [MoodRecord(user=user, date=today - timedelta(days=index), mood=3) for index in range(10)]
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(username="alice"))
+
+    def capture_selects(self, url):
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith("SELECT"):
+                statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = self.client.get(url)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, url)
+        return statements
+
+    def query_plan(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_endpoints_use_indexes(self):
+        for url in self.ENDPOINTS:
+            for sql, params in self.capture_selects(url):
+                tables = [table for table in self.HOT_TABLES if re.search(rf'"{table}"', sql)]
+                if not tables:
+                    continue
+                plan = self.query_plan(sql, params)
+                with self.subTest(url=url, sql=sql, plan=plan):
+                    for table in tables:
+                        self.assertFalse(any(re.match(rf"SCAN {table}\b", line) for line in plan))
+                        self.assertTrue(
+                            any(re.match(rf"SEARCH {table} USING (COVERING )?INDEX", line) for line in plan)
+                        )
+
+    def test_admin_user_list_ordered_by_stats_index(self):
+        admin = User.objects.create_user(username="admin", password="pw")
+        UserProfile.objects.create(user=admin, role="admin")
+        self.client.force_authenticate(admin)
+        for ordering in ("-total_focus_minutes", "total_focus_minutes"):
+            url = f"/api/admin/users/?ordering={ordering}"
+            ordered = [(sql, params) for sql, params in self.capture_selects(url) if 'ORDER BY "core_userstats"' in sql]
+            self.assertEqual(len(ordered), 1, url)
+            plan = self.query_plan(*ordered[0])
+            with self.subTest(url=url, plan=plan):
+                self.assertIn("SCAN core_userstats USING INDEX userstats_minutes_user_idx", plan)
+                self.assertFalse(any("TEMP B-TREE" in line for line in plan))
+
+
+    def test_admin_user_list_includes_bulk_created_users(self):
+        admin = User.objects.create_user(username="admin", password="pw")
+        UserProfile.objects.create(user=admin, role="admin")
+        self.client.force_authenticate(admin)
+        # bulk_create 不触发 post_save，统计行由 auth_user 的插入触发器补上
+        User.objects.bulk_create([User(username="carol"), User(username="dave")])
+        for ordering in ("-total_focus_minutes", "-date_joined"):
+            response = self.client.get(f"/api/admin/users/?ordering={ordering}&page_size=50")
+            usernames = {user["username"] for user in response.data["results"]}
+            self.assertLessEqual({"carol", "dave"}, usernames, ordering)
+        response = self.client.get("/api/admin/users/export/")
+        rows = csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode("utf-8-sig")))
+        self.assertLessEqual({"carol", "dave"}, {row["username"] for row in rows})
+
+
+class CategoryRollupTests(TestCase):
+    """分类时长随任务分类修改与任务删除更新，与直接按当前任务分类统计的结果一致"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.task_id = self.client.post("/api/tasks/", {"title": "读书", "category": "学习"}, format="json").data["id"]
+        for minutes in (25, 15):
+            self.client.post("/api/sessions/", {"duration_minutes": minutes, "task": self.task_id}, format="json")
+        self.client.post("/api/sessions/", {"duration_minutes": 10}, format="json")
+
+    def category_stats(self):
+        cache.clear()
+        response = self.client.get("/api/stats/overview/?days=7")
+        self.assertEqual(response.status_code, 200)
+        return {name: float(minutes) for name, minutes in response.data["category_stats"].items()}
+
+    def test_category_edit(self):
+        self.assertEqual(self.category_stats(), {"学习": 40})
+        self.client.patch(f"/api/tasks/{self.task_id}/", {"category": "工作"}, format="json")
+        self.assertEqual(self.category_stats(), {"工作": 40})
+
+    def test_bulk_update_category(self):
+        response = self.client.post(
+            "/api/tasks/bulk_update/", {"ids": [self.task_id], "category": "阅读"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.category_stats(), {"阅读": 40})
+
+    def test_task_delete(self):
+        self.client.delete(f"/api/tasks/{self.task_id}/")
+        self.assertEqual(self.category_stats(), {})
+        self.assertEqual(UserStats.objects.get(user=self.user).total_sessions, 3)
+
+
+class ArchiveRollupTests(TestCase):
+    """归档前后日汇总（含分类时长）与累计统计一致，归档后修改或删除任务仍按任务当前分类计算"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.task_id = self.client.post("/api/tasks/", {"title": "写报告", "category": "工作"}, format="json").data["id"]
+        started_at = timezone.now() - timedelta(days=400)
+        sessions = [
+            {"duration_minutes": 25, "task": self.task_id, "started_at": started_at.isoformat()},
+            {"duration_minutes": 15, "started_at": started_at.isoformat()},
+        ]
+        self.client.post("/api/sessions/bulk/", {"sessions": sessions}, format="json")
+        # 花园条目保留专注时的分类“工作”，任务之后改为“学习”
+        self.client.patch(f"/api/tasks/{self.task_id}/", {"category": "学习"}, format="json")
+
+    def rollups(self):
+        stats = UserStats.objects.get(user=self.user)
+        return (
+            [(rollup.date, rollup.total_minutes, rollup.session_count, rollup.category_minutes)
+             for rollup in DailyFocusRollup.objects.filter(user=self.user).order_by("date")],
+            (stats.total_focus_minutes, stats.total_sessions),
+        )
+
+    def category_minutes(self):
+        return [rollup[-1] for rollup in self.rollups()[0]]
+
+    def test_archiving_keeps_rollups(self):
+        before = self.rollups()
+        self.assertEqual(self.category_minutes(), [{"学习": "25.00"}])
+        call_command("archive_focus_sessions", stdout=io.StringIO())
+        self.assertEqual(FocusSession.objects.filter(user=self.user).count(), 0)
+        self.assertEqual(self.rollups(), before)
+        call_command("rebuild_focus_rollups", stdout=io.StringIO())
+        self.assertEqual(self.rollups(), before)
+
+    def test_task_edits_after_archiving(self):
+        call_command("archive_focus_sessions", stdout=io.StringIO())
+        self.client.patch(f"/api/tasks/{self.task_id}/", {"category": "阅读"}, format="json")
+        self.assertEqual(self.category_minutes(), [{"阅读": "25.00"}])
+        self.client.post("/api/tasks/bulk_update/", {"ids": [self.task_id], "category": "运动"}, format="json")
+        self.assertEqual(self.category_minutes(), [{"运动": "25.00"}])
+        self.client.delete(f"/api/tasks/{self.task_id}/")
+        self.assertEqual(self.category_minutes(), [{}])
+        self.assertFalse(FocusSessionArchive.objects.filter(task_id__isnull=False).exists())
+
+
+class LocalDateTests(TestCase):
+    """今日心情按本地日期存取，首页与心情接口在 UTC 与本地日期不同的时段保持一致"""
+
+    def test_dashboard_mood_uses_local_date(self):
+        user = User.objects.create_user(username="alice", password="pw")
+        client = APIClient()
+        client.force_authenticate(user)
+        # 本地 00:30（Asia/Shanghai）时 UTC 仍是前一天
+        local_date = timezone.localdate()
+        local_midnight = timezone.make_aware(datetime.combine(local_date, time(0, 30)), timezone.get_current_timezone())
+        with mock.patch("django.utils.timezone.now", return_value=local_midnight.astimezone(dt_timezone.utc)):
+            client.post("/api/moods/today/", {"mood": 5, "note": "早"}, format="json")
+            dashboard = client.get("/api/dashboard/").data
+            today = client.get("/api/moods/today/").data
+        self.assertEqual(MoodRecord.objects.get(user=user).date, local_date)
+        self.assertEqual(dashboard["mood"]["mood"], 5)
+        self.assertEqual(today["mood"], 5)
+
+
+    def test_dashboard_today_stats_match_stats_endpoint(self):
+        user = User.objects.create_user(username="alice", password="pw")
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get("/api/dashboard/").data["today_stats"], client.get("/api/stats/today/").data)
+        client.post("/api/sessions/", {"duration_minutes": 25}, format="json")
+        cache.clear()
+        dashboard = client.get("/api/dashboard/").data["today_stats"]
+        self.assertEqual(dashboard, client.get("/api/stats/today/").data)
+        self.assertEqual(dashboard["today_minutes"], "25.00")
+
+
+class AsyncStreamingTests(TestCase):
+    """ASGI 下导出与媒体文件分块发送，不会先把整个响应体读入内存"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="alice", password="pw")
+        cls.token = Token.objects.create(user=cls.user)
+        Task.objects.bulk_create([Task(user=cls.user, title=f"任务 {index} " * 5) for index in range(2000)])
+
+    async def chunks(self, response):
+        self.assertTrue(response.is_async)
+        return [chunk async for chunk in response.streaming_content]
+
+    async def test_export_streams_in_chunks(self):
+        response = await self.async_client.get(
+            "/api/export/?type=tasks&format=csv", headers={"authorization": f"Token {self.token.key}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        chunks = await self.chunks(response)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks).decode("utf-8-sig").count("\n"), 2001)
+
+    async def test_media_range_streams_in_chunks(self):
+        content = os.urandom(300 * 1024)
+        with tempfile.TemporaryDirectory() as root, override_settings(MEDIA_ROOT=root):
+            Path(root, "rain.mp3").write_bytes(content)
+            response = await self.async_client.get("/media/rain.mp3", headers={"range": "bytes=100-200099"})
+            self.assertEqual(response.status_code, 206)
+            chunks = await self.chunks(response)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), content[100:200100])
+
+
+class MediaRangeTests(TestCase):
+    """206 响应交给 waitress 的 file_wrapper 发送时只读取请求的区间"""
+
+    def test_range_uses_wsgi_file_wrapper(self):
+        content = os.urandom(300 * 1024)
+        headers = {}
+        with tempfile.TemporaryDirectory() as root, override_settings(MEDIA_ROOT=root):
+            Path(root, "rain.mp3").write_bytes(content)
+            environ = RequestFactory().get("/media/rain.mp3", headers={"range": "bytes=100-200099"}).environ
+            environ["wsgi.file_wrapper"] = ReadOnlyFileBasedBuffer
+            body = WSGIHandler()(environ, lambda status, response_headers: headers.update(response_headers))
+            self.assertIsInstance(body, ReadOnlyFileBasedBuffer)
+            size = body.prepare(int(headers["Content-Length"]))
+            data = body.get(size, skip=True)
+            body.close()
+        self.assertEqual(size, 200000)
+        self.assertEqual(data, content[100:200100])
+        self.assertEqual(headers["Content-Range"], f"bytes 100-200099/{len(content)}")
+
+
+class MetricsMiddlewareTests(TestCase):
+    """同步与异步中间件链都能统计请求的 SQL 次数（异步视图的查询在 sync_to_async 线程中执行）"""
+
+    def setUp(self):
+        registry.reset()
+
+    @staticmethod
+    def count_two_queries():
+        User.objects.count()
+        Task.objects.count()
+        return HttpResponse()
+
+    def test_sync_path_counts_queries(self):
+        middleware = MetricsMiddleware(lambda request: self.count_two_queries())
+        self.assertFalse(iscoroutinefunction(middleware))
+        middleware(RequestFactory().get("/"))
+        self.assertEqual(registry.queries[("GET", "unmatched")], 2)
+
+    async def test_async_path_counts_queries(self):
+        async def view(request):
+            await User.objects.acount()
+            await Task.objects.acount()
+            return HttpResponse()
+
+        middleware = MetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get("/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(registry.queries[("GET", "unmatched")], 2)
+        self.assertEqual(registry.in_flight, 0)
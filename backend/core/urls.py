@@ -1,12 +1,17 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
+    AdminMetricsView,
     AdminOverviewView,
+    AdminUserExportView,
     AdminUserListView,
     AmbientSoundAdminViewSet,
     PublishedAmbientSoundViewSet,
     AnnouncementViewSet,
+    DashboardView,
+    ExportView,
     FocusSessionViewSet,
     GardenItemListView,
     GardenItemSummaryView,
@@ -30,20 +35,42 @@ router.register(r"admin/announcements", AnnouncementViewSet, basename="admin-ann
 router.register(r"admin/sounds", AmbientSoundAdminViewSet, basename="admin-sound")
 router.register(r"sounds", PublishedAmbientSoundViewSet, basename="sound")
 
+# 读多写少的统计/花园接口：ASGI 模式下换成异步 ORM 实现
+if settings.TIMEGARDEN_ASYNC_VIEWS:
+    from .async_views import garden_items, garden_summary, overview_stats, today_stats
+
+    read_views = {
+        "stats/today/": today_stats,
+        "stats/overview/": overview_stats,
+        "garden/items/": garden_items,
+        "garden/items/summary/": garden_summary,
+    }
+else:
+    read_views = {
+        "stats/today/": TodayStatsView.as_view(),
+        "stats/overview/": OverviewStatsView.as_view(),
+        "garden/items/": GardenItemListView.as_view(),
+        "garden/items/summary/": GardenItemSummaryView.as_view(),
+    }
+
 urlpatterns = [
     path("auth/register/", RegisterView.as_view()),
     path("auth/login/", LoginView.as_view()),
     path("auth/logout/", LogoutView.as_view()),
     path("profile/", ProfileView.as_view()),
-    path("stats/today/", TodayStatsView.as_view()),
-    path("stats/overview/", OverviewStatsView.as_view()),
+    path("dashboard/", DashboardView.as_view()),
+    path("export/", ExportView.as_view()),
+    path("stats/today/", read_views["stats/today/"]),
+    path("stats/overview/", read_views["stats/overview/"]),
     path("moods/today/", MoodTodayView.as_view()),
     path("moods/recent/", MoodRecentView.as_view()),
     path("garden/overview/", GardenOverviewView.as_view()),
-    path("garden/items/", GardenItemListView.as_view()),
-    path("garden/items/summary/", GardenItemSummaryView.as_view()),
+    path("garden/items/", read_views["garden/items/"]),
+    path("garden/items/summary/", read_views["garden/items/summary/"]),
     path("admin/overview/", AdminOverviewView.as_view()),
+    path("admin/metrics/", AdminMetricsView.as_view()),
     path("admin/users/", AdminUserListView.as_view()),
+    path("admin/users/export/", AdminUserExportView.as_view()),
     path("announcements/", PublishedAnnouncementListView.as_view()),
     path("", include(router.urls)),
 ]
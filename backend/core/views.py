@@ -1,33 +1,70 @@
+import csv
+import io
+from collections import defaultdict
 from datetime import timedelta
-from pathlib import Path
+from decimal import Decimal
 
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models import Count, Sum
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Q, Sum
 from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.http import HttpResponse
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import AmbientSound, Announcement, FocusSession, GardenItem, MoodRecord, Task, UserProfile
+from .authentication import token_cache
+from .cache import bump_data_version, cache_per_user
+from .conditional import conditional_get
+from .counters import FOCUS_MINUTES, SCENE_PREFIX, TODAY_PLAN_USERS, USERS, read_counters, refresh_today_plan
+from .exporting import (
+    EXPORT_FORMATS,
+    EXPORT_SECTIONS,
+    CSVStreamRenderer,
+    NDJSONStreamRenderer,
+    csv_response,
+    export_response,
+)
+from .metrics import registry as metrics_registry
+from .models import (
+    AmbientSound,
+    Announcement,
+    DailyFocusRollup,
+    FocusSession,
+    FocusSessionArchive,
+    GardenItem,
+    MoodRecord,
+    SiteDailyRollup,
+    Task,
+    UserProfile,
+)
+from .pagination import AdminUserPagination, CreatedAtCursorPagination
 from .permissions import IsAdminUserRole
+from .rollups import rebuild_daily_rollups, record_sessions, session_local_date, streak_days, task_session_days
 from .serializers import (
     AdminUserSerializer,
     AmbientSoundSerializer,
     AnnouncementSerializer,
+    ArchivedGardenItemSerializer,
+    FocusSessionBulkItemSerializer,
     FocusSessionSerializer,
     GardenItemSerializer,
     GardenViewSerializer,
     MoodRecordSerializer,
+    TaskBulkUpdateSerializer,
     TaskSerializer,
+    TodayStatsSerializer,
     UserProfileSerializer,
 )
+from .sounds import sound_manifest
+from .streaming import stream_async
 
 
 def map_item_type(category: str, is_dead: bool) -> str:
@@ -45,6 +82,111 @@ def map_item_type(category: str, is_dead: bool) -> str:
     return base
 
 
+def garden_item_fields(session):
+    category = session.task.category if session.task else ""
+    return {
+        "user": session.user,
+        "date": session_local_date(session),
+        "category": category,
+        "item_type": map_item_type(category, not session.is_completed),
+        "is_dead": not session.is_completed,
+    }
+
+
+def garden_date_range(params, default_range, allowed_ranges):
+    """解析 range/date 查询参数，返回 ((start_date, end_date), error)"""
+    range_param = params.get("range", default_range)
+    date_param = params.get("date")
+    target_date = parse_date(date_param) if date_param else timezone.localdate()
+    if not target_date:
+        return None, "无效日期格式"
+    if range_param not in allowed_ranges:
+        return None, f"range 仅支持 {'/'.join(allowed_ranges)}"
+
+    if range_param == "day":
+        return (target_date, target_date), None
+    if range_param == "week":
+        start_date = target_date - timedelta(days=target_date.isoweekday() - 1)
+        return (start_date, start_date + timedelta(days=6)), None
+    start_date = target_date.replace(day=1)
+    next_month = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return (start_date, next_month - timedelta(days=1)), None
+
+
+def latest_change(queryset, field):
+    """条件请求校验值：一次聚合取最新修改时间与行数"""
+    result = queryset.order_by().aggregate(last_modified=Max(field), count=Count("id"))
+    return result["last_modified"], result["count"]
+
+
+def combine_changes(*changes):
+    timestamps = [last_modified for last_modified, _ in changes if last_modified]
+    return (max(timestamps) if timestamps else None), tuple(changes)
+
+
+def task_list_validator(view, request):
+    return latest_change(view.filter_queryset(view.get_queryset()), "updated_at")
+
+
+def focus_rollup_validator(view, request):
+    return latest_change(DailyFocusRollup.objects.filter(user=request.user), "updated_at")
+
+
+def overview_stats_validator(view, request):
+    return combine_changes(
+        latest_change(DailyFocusRollup.objects.filter(user=request.user), "updated_at"),
+        latest_change(Task.objects.filter(user=request.user), "updated_at"),
+    )
+
+
+def mood_recent_validator(view, request):
+    start = timezone.localdate() - timedelta(days=int(request.query_params.get("days", 7)) - 1)
+    return latest_change(MoodRecord.objects.filter(user=request.user, date__gte=start), "updated_at")
+
+
+def garden_items_validator(default_range, allowed_ranges):
+    def validator(view, request):
+        date_range, error = garden_date_range(request.query_params, default_range, allowed_ranges)
+        if error:
+            return None
+        items, archived = garden_items_querysets(request.user, *date_range)
+        return combine_changes(latest_change(items, "created_at"), latest_change(archived, "garden_created_at"))
+
+    return validator
+
+
+def focus_totals(user, today, period=None):
+    """一次条件聚合从日汇总表取出累计次数、今日专注数据以及可选时间段 (start, end) 的合计"""
+    aggregates = {
+        "all_sessions": Coalesce(Sum("session_count"), 0),
+        "all_completed": Coalesce(Sum("completed_count"), 0),
+        "all_aborted": Coalesce(Sum("aborted_count"), 0),
+        "all_minutes": Coalesce(Sum("total_minutes"), Decimal("0")),
+        "today_minutes": Coalesce(Sum("total_minutes", filter=Q(date=today)), Decimal("0")),
+        "today_sessions": Coalesce(Sum("session_count", filter=Q(date=today)), 0),
+    }
+    if period:
+        in_period = Q(date__range=period)
+        aggregates.update(
+            period_sessions=Coalesce(Sum("session_count", filter=in_period), 0),
+            period_completed=Coalesce(Sum("completed_count", filter=in_period), 0),
+            period_aborted=Coalesce(Sum("aborted_count", filter=in_period), 0),
+            period_minutes=Coalesce(Sum("total_minutes", filter=in_period), Decimal("0")),
+        )
+    totals = DailyFocusRollup.objects.filter(user=user).aggregate(**aggregates)
+    if period is None:
+        return totals
+    if not period:
+        # 全部时间段即累计数据，无需额外聚合
+        totals.update(
+            period_sessions=totals["all_sessions"],
+            period_completed=totals["all_completed"],
+            period_aborted=totals["all_aborted"],
+            period_minutes=totals["all_minutes"],
+        )
+    return totals
+
+
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -99,6 +241,7 @@ class LogoutView(APIView):
 
     def post(self, request):
         Token.objects.filter(user=request.user).delete()
+        token_cache.discard_user(request.user.pk)
         return Response({"detail": "退出成功"})
 
 
@@ -110,10 +253,24 @@ class ProfileView(generics.RetrieveUpdateAPIView):
         profile, _ = UserProfile.objects.get_or_create(user=self.request.user)
         return profile
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+
+def read_csv_upload(upload):
+    """读取上传的 CSV 文件为字典列表，空单元格视为未填写以使用默认值"""
+    text = upload.read().decode("utf-8-sig")
+    return [
+        {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
 
 class TaskViewSet(viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         qs = Task.objects.filter(user=self.request.user).order_by("-created_at")
@@ -134,125 +291,255 @@ class TaskViewSet(viewsets.ModelViewSet):
             qs = qs.filter(priority="important")
         return qs
 
+    @conditional_get(task_list_validator)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        previous_category = serializer.instance.category
+        task = serializer.save()
+        if task.category != previous_category:
+            # 日汇总按任务分类累计时长，分类修改后同步归档记录并重算该任务专注记录所在日期
+            FocusSessionArchive.objects.filter(user=self.request.user, task_id=task.id).update(task_category=task.category)
+            rebuild_daily_rollups(self.request.user, task_session_days(self.request.user, [task.id]))
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        days = task_session_days(self.request.user, [instance.id])
+        FocusSessionArchive.objects.filter(user=self.request.user, task_id=instance.id).update(task_id=None)
+        instance.delete()
+        # 删除任务后其专注记录（含归档记录）不再关联任务，不再计入分类时长
+        rebuild_daily_rollups(self.request.user, days)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """批量导入任务：JSON 数组或上传 CSV 文件（file 字段），整体校验后单事务批量写入，逐条返回结果"""
+        upload = request.FILES.get("file")
+        if upload is not None:
+            try:
+                items = read_csv_upload(upload)
+            except (UnicodeDecodeError, csv.Error):
+                return Response({"detail": "CSV 文件需为 UTF-8 编码的有效 CSV"}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            items = request.data.get("tasks") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"detail": "tasks 必须为非空数组"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = settings.TIMEGARDEN_BULK_TASK_LIMIT
+        if len(items) > limit:
+            return Response({"detail": f"单次最多导入 {limit} 个任务"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        pending = []
+        for index, item in enumerate(items):
+            serializer = TaskSerializer(data=item, context={"request": request})
+            if serializer.is_valid():
+                pending.append((index, Task(user=request.user, **serializer.validated_data)))
+                results.append(None)
+            else:
+                results.append({"index": index, "status": "error", "errors": serializer.errors})
+
+        if pending:
+            with transaction.atomic():
+                # bulk_create 不触发 post_save，手动刷新缓存版本与今日计划计数
+                tasks = Task.objects.bulk_create([task for _, task in pending])
+                if any(task.is_today for task in tasks):
+                    refresh_today_plan(request.user.id)
+                bump_data_version(request.user.id)
+            for (index, _), task in zip(pending, tasks):
+                results[index] = {"index": index, "status": "created", "id": task.id}
+
+        created = len(pending)
+        if created == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"created": created, "failed": len(items) - created, "results": results},
+            status=response_status,
+        )
+
+    @action(detail=False, methods=["post"])
+    def bulk_update(self, request):
+        """批量修改当前用户的任务，一条 UPDATE 语句完成"""
+        serializer = TaskBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        ids = changes.pop("ids")
+
+        tasks = Task.objects.filter(user=request.user, id__in=ids)
+        with transaction.atomic():
+            found = set(tasks.values_list("id", flat=True))
+            recategorized = []
+            if "category" in changes:
+                recategorized = list(tasks.exclude(category=changes["category"]).values_list("id", flat=True))
+            # queryset.update 不触发 post_save，也不会自动刷新 auto_now 字段
+            updated = tasks.update(**changes, updated_at=timezone.now())
+            if "is_today" in changes:
+                refresh_today_plan(request.user.id)
+            if recategorized:
+                FocusSessionArchive.objects.filter(user=request.user, task_id__in=recategorized).update(
+                    task_category=changes["category"]
+                )
+                rebuild_daily_rollups(request.user, task_session_days(request.user, recategorized))
+            bump_data_version(request.user.id)
+        return Response({"updated": updated, "missing": [task_id for task_id in ids if task_id not in found]})
+
     @action(detail=True, methods=["post"])
     def set_today(self, request, pk=None):
         task = self.get_object()
         task.is_today = not task.is_today
-        task.save()
+        with transaction.atomic():
+            task.save()
         return Response({"id": task.id, "is_today": task.is_today})
 
 
 class FocusSessionViewSet(viewsets.ModelViewSet):
     serializer_class = FocusSessionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         return FocusSession.objects.filter(user=self.request.user).order_by("-created_at")
 
+    @transaction.atomic
     def perform_create(self, serializer):
         session = serializer.save(user=self.request.user)
-        task = session.task
-        category = task.category if task else ""
-        item_type = map_item_type(category, not session.is_completed)
-        GardenItem.objects.get_or_create(
-            session=session,
-            defaults={
-                "user": self.request.user,
-                "date": session.created_at.date() if session.created_at else timezone.now().date(),
-                "category": category,
-                "item_type": item_type,
-                "is_dead": not session.is_completed,
-            },
+        GardenItem.objects.get_or_create(session=session, defaults=garden_item_fields(session))
+        record_sessions(self.request.user, [session])
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """离线客户端批量回放专注记录：整体校验，单事务批量写入，逐条返回结果"""
+        items = request.data.get("sessions") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"detail": "sessions 必须为非空数组"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = settings.TIMEGARDEN_BULK_SESSION_LIMIT
+        if len(items) > limit:
+            return Response({"detail": f"单次最多提交 {limit} 条记录"}, status=status.HTTP_400_BAD_REQUEST)
+
+        task_ids = {str(item.get("task")) for item in items if isinstance(item, dict)}
+        task_ids = {int(task_id) for task_id in task_ids if task_id.isdigit()}
+        tasks = Task.objects.filter(user=request.user, id__in=task_ids).in_bulk()
+        results = []
+        pending = []
+        for index, item in enumerate(items):
+            serializer = FocusSessionBulkItemSerializer(data=item, context={"request": request, "tasks": tasks})
+            if serializer.is_valid():
+                pending.append((index, FocusSession(user=request.user, **serializer.validated_data)))
+                results.append(None)
+            else:
+                results.append({"index": index, "status": "error", "errors": serializer.errors})
+
+        if pending:
+            with transaction.atomic():
+                sessions = FocusSession.objects.bulk_create([session for _, session in pending])
+                GardenItem.objects.bulk_create(
+                    [GardenItem(session=session, **garden_item_fields(session)) for session in sessions]
+                )
+                record_sessions(request.user, sessions)
+                bump_data_version(request.user.id)
+            for (index, _), session in zip(pending, sessions):
+                results[index] = {"index": index, "status": "created", "id": session.id}
+
+        created = len(pending)
+        if created == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"created": created, "failed": len(items) - created, "results": results},
+            status=response_status,
         )
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        previous_day = session_local_date(serializer.instance)
+        session = serializer.save()
+        rebuild_daily_rollups(self.request.user, {previous_day, session_local_date(session)})
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        day = session_local_date(instance)
+        instance.delete()
+        rebuild_daily_rollups(self.request.user, {day})
+
+
+def today_stats_payload(rollup, streak):
+    return TodayStatsSerializer(
+        {
+            "today_minutes": rollup.total_minutes if rollup else 0,
+            "today_sessions": rollup.session_count if rollup else 0,
+            "streak_days": streak,
+        }
+    ).data
+
 
 class TodayStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(focus_rollup_validator)
+    @cache_per_user
     def get(self, request):
-        now = timezone.now()
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_sessions = FocusSession.objects.filter(user=request.user, created_at__gte=start_of_day)
-        total_minutes = today_sessions.aggregate(total=Sum("duration_minutes"))["total"] or 0
-        total_pomos = today_sessions.count()
-
-        # 计算连续专注天数
-        session_dates = set(
-            FocusSession.objects.filter(user=request.user)
-            .dates("created_at", "day", order="DESC")
-        )
-        streak_days = 0
-        current_day = now.date()
-        while current_day in session_dates:
-            streak_days += 1
-            current_day -= timedelta(days=1)
-
-        return Response(
-            {
-                "today_minutes": total_minutes,
-                "today_sessions": total_pomos,
-                "streak_days": streak_days,
-            }
-        )
+        today = timezone.localdate()
+        rollup = DailyFocusRollup.objects.filter(user=request.user, date=today).first()
+        return Response(today_stats_payload(rollup, streak_days(request.user, today)))
+
+
+def overview_stats_payload(start_date, days, rollups, total_tasks, completed_tasks):
+    daily_map = {start_date + timedelta(days=i): 0 for i in range(days)}
+    category_stats = defaultdict(Decimal)
+    for rollup in rollups:
+        daily_map[rollup.date] = rollup.total_minutes
+        for category, minutes in rollup.category_minutes.items():
+            category_stats[category or "未分类"] += Decimal(minutes)
+
+    return {
+        "daily_minutes": [
+            {"date": day.strftime("%m-%d"), "minutes": daily_map[day]} for day in sorted(daily_map.keys())
+        ],
+        "category_stats": dict(category_stats),
+        "completion_rate": completed_tasks / total_tasks if total_tasks else 0,
+        "total_tasks": total_tasks,
+        "completed_tasks": completed_tasks,
+    }
 
 
 class OverviewStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(overview_stats_validator)
+    @cache_per_user
     def get(self, request):
-        today = timezone.now().date()
+        today = timezone.localdate()
         days = int(request.query_params.get("days", 7))
         start_date = today - timedelta(days=days - 1)
-        sessions = FocusSession.objects.filter(user=request.user, created_at__date__gte=start_date)
-
-        daily_map = {start_date + timedelta(days=i): 0 for i in range(days)}
-        daily = (
-            sessions.annotate(day=models.functions.TruncDate("created_at"))
-            .values("day")
-            .annotate(total=Sum("duration_minutes"))
-            .order_by("day")
-        )
-        for item in daily:
-            daily_map[item["day"]] = item["total"]
-
-        category_stats = (
-            sessions.filter(task__isnull=False)
-            .values("task__category")
-            .annotate(total=Sum("duration_minutes"))
-        )
-
+        rollups = DailyFocusRollup.objects.filter(user=request.user, date__gte=start_date, date__lte=today)
         total_tasks = Task.objects.filter(user=request.user).count()
         completed_tasks = Task.objects.filter(user=request.user, status="done").count()
-        completion_rate = completed_tasks / total_tasks if total_tasks else 0
-
-        return Response(
-            {
-                "daily_minutes": [
-                    {"date": day.strftime("%m-%d"), "minutes": daily_map[day]} for day in sorted(daily_map.keys())
-                ],
-                "category_stats": {item["task__category"] or "未分类": item["total"] for item in category_stats},
-                "completion_rate": completion_rate,
-                "total_tasks": total_tasks,
-                "completed_tasks": completed_tasks,
-            }
-        )
+        return Response(overview_stats_payload(start_date, days, rollups, total_tasks, completed_tasks))
 
 
 class MoodTodayView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        today = timezone.now().date()
+        today = timezone.localdate()
         record = MoodRecord.objects.filter(user=request.user, date=today).first()
         if not record:
             return Response({"mood": None, "note": ""})
         return Response(MoodRecordSerializer(record).data)
 
     def post(self, request):
-        today = timezone.now().date()
+        today = timezone.localdate()
         serializer = MoodRecordSerializer(data={
             "date": today,
             "mood": request.data.get("mood", "3"),
@@ -266,9 +553,10 @@ class MoodTodayView(APIView):
 class MoodRecentView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(mood_recent_validator)
     def get(self, request):
         days = int(request.query_params.get("days", 7))
-        today = timezone.now().date()
+        today = timezone.localdate()
         start = today - timedelta(days=days - 1)
         records = MoodRecord.objects.filter(user=request.user, date__gte=start).order_by("-date")
         return Response(MoodRecordSerializer(records, many=True).data)
@@ -277,174 +565,302 @@ class MoodRecentView(APIView):
 class GardenOverviewView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(focus_rollup_validator)
+    @cache_per_user
     def get(self, request):
-        sessions = FocusSession.objects.filter(user=request.user)
-        completed_count = sessions.filter(is_completed=True).count()
-        aborted_count = sessions.filter(is_completed=False).count()
-        total_sessions = sessions.count()
-
-        now = timezone.now()
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_focus_minutes = sessions.filter(created_at__gte=start_of_day).aggregate(
-            total=Sum("duration_minutes")
-        )["total"] or 0
-
-        session_dates = set(sessions.dates("created_at", "day", order="DESC"))
-        streak_days = 0
-        current_day = now.date()
-        while current_day in session_dates:
-            streak_days += 1
-            current_day -= timedelta(days=1)
-
-        serializer = GardenViewSerializer(
+        range_param = request.query_params.get("range")
+        period = None
+        if range_param == "all":
+            period = ()
+        elif range_param:
+            if range_param not in ("week", "month"):
+                return Response({"detail": "range 仅支持 week/month/all"}, status=status.HTTP_400_BAD_REQUEST)
+            period, error = garden_date_range(request.query_params, range_param, ("week", "month"))
+            if error:
+                return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = timezone.localdate()
+        totals = focus_totals(request.user, today, period)
+        data = {
+            "total_sessions": totals["all_sessions"],
+            "completed_count": totals["all_completed"],
+            "aborted_count": totals["all_aborted"],
+            "streak_days": streak_days(request.user, today),
+            "today_focus_minutes": totals["today_minutes"],
+        }
+        if period is not None:
+            data.update(
+                range=range_param,
+                period_sessions=totals["period_sessions"],
+                period_completed=totals["period_completed"],
+                period_aborted=totals["period_aborted"],
+                period_minutes=totals["period_minutes"],
+            )
+        return Response(GardenViewSerializer(data).data)
+
+
+def garden_items_querysets(user, start_date, end_date):
+    """花园条目：热表与归档表各一个查询，历史日期范围的条目在归档表中"""
+    items = GardenItem.objects.filter(user=user, date__gte=start_date, date__lte=end_date).order_by("-created_at")
+    archived = FocusSessionArchive.objects.filter(
+        user=user, garden_date__gte=start_date, garden_date__lte=end_date
+    ).order_by("-garden_created_at")
+    return items, archived
+
+
+def garden_items_payload(items, archived):
+    """合并热表与归档表的条目，按创建时间倒序"""
+    rows = [(item.created_at, data) for item, data in zip(items, GardenItemSerializer(items, many=True).data)]
+    rows += [
+        (row.garden_created_at, data)
+        for row, data in zip(archived, ArchivedGardenItemSerializer(archived, many=True).data)
+    ]
+    rows.sort(key=lambda row: row[0], reverse=True)
+    return [data for _, data in rows]
+
+
+def garden_summary_querysets(user, start_date, end_date):
+    """花园按日汇总与按日 + 分类汇总两个查询，各自 UNION ALL 合并热表与归档表"""
+    items = GardenItem.objects.filter(user=user, date__gte=start_date, date__lte=end_date)
+    archived = FocusSessionArchive.objects.filter(
+        user=user, garden_date__gte=start_date, garden_date__lte=end_date
+    ).annotate(date_key=F("garden_date"))
+    counts = {
+        "total": Count("id"),
+        "completed": Count("id", filter=models.Q(is_dead=False)),
+        "aborted": Count("id", filter=models.Q(is_dead=True)),
+    }
+    by_date = items.annotate(date_key=F("date")).values("date_key").annotate(**counts).order_by()
+    by_date = by_date.union(archived.values("date_key").annotate(**counts).order_by(), all=True)
+    by_category = items.annotate(date_key=F("date")).values("date_key", "category").annotate(**counts).order_by()
+    by_category = by_category.union(archived.values("date_key", "category").annotate(**counts).order_by(), all=True)
+    return by_date, by_category
+
+
+def garden_summary_payload(by_date, by_category):
+    """同一日期/分类可能同时出现在热表与归档表中，按键累加"""
+    summary_map = {}
+    for entry in by_date:
+        summary = summary_map.setdefault(
+            entry["date_key"],
             {
-                "total_sessions": total_sessions,
-                "completed_count": completed_count,
-                "aborted_count": aborted_count,
-                "streak_days": streak_days,
-                "today_focus_minutes": today_focus_minutes,
-            }
+                "date": entry["date_key"],
+                "total": 0,
+                "completed": 0,
+                "aborted": 0,
+                "by_category": {},
+            },
         )
-        return Response(serializer.data)
+        for key in ("total", "completed", "aborted"):
+            summary[key] += entry[key]
+    for entry in by_category:
+        date_key = entry["date_key"]
+        summary = summary_map.setdefault(
+            date_key,
+            {
+                "date": date_key,
+                "total": 0,
+                "completed": 0,
+                "aborted": 0,
+                "by_category": {},
+            },
+        )
+        category_name = entry["category"] or "未分类"
+        counts = summary["by_category"].setdefault(category_name, {"total": 0, "completed": 0, "aborted": 0})
+        for key in counts:
+            counts[key] += entry[key]
+    return [summary_map[key] for key in sorted(summary_map.keys())]
 
 
 class GardenItemListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(garden_items_validator("day", ("day", "week", "month")))
     def get(self, request):
-        range_param = request.query_params.get("range", "day")
-        date_param = request.query_params.get("date")
-        target_date = parse_date(date_param) if date_param else timezone.localdate()
-        if not target_date:
-            return Response({"detail": "无效日期格式"}, status=status.HTTP_400_BAD_REQUEST)
-
-        if range_param == "day":
-            start_date = end_date = target_date
-        elif range_param == "week":
-            start_date = target_date - timedelta(days=target_date.isoweekday() - 1)
-            end_date = start_date + timedelta(days=6)
-        elif range_param == "month":
-            start_date = target_date.replace(day=1)
-            next_month = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
-            end_date = next_month - timedelta(days=1)
-        else:
-            return Response({"detail": "range 仅支持 day/week/month"}, status=status.HTTP_400_BAD_REQUEST)
+        date_range, error = garden_date_range(request.query_params, "day", ("day", "week", "month"))
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+        start_date, end_date = date_range
 
-        items = GardenItem.objects.filter(
-            user=request.user, date__gte=start_date, date__lte=end_date
-        ).order_by("-created_at")
-        serializer = GardenItemSerializer(items, many=True)
-        return Response(serializer.data)
+        items, archived = garden_items_querysets(request.user, start_date, end_date)
+        return Response(garden_items_payload(list(items), list(archived)))
 
 
 class GardenItemSummaryView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(garden_items_validator("week", ("week", "month")))
+    @cache_per_user
     def get(self, request):
-        range_param = request.query_params.get("range", "week")
-        date_param = request.query_params.get("date")
-        target_date = parse_date(date_param) if date_param else timezone.localdate()
-        if not target_date:
-            return Response({"detail": "无效日期格式"}, status=status.HTTP_400_BAD_REQUEST)
-
-        if range_param == "week":
-            start_date = target_date - timedelta(days=target_date.isoweekday() - 1)
-            end_date = start_date + timedelta(days=6)
-        elif range_param == "month":
-            start_date = target_date.replace(day=1)
-            next_month = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
-            end_date = next_month - timedelta(days=1)
-        else:
-            return Response({"detail": "range 仅支持 week/month"}, status=status.HTTP_400_BAD_REQUEST)
-
-        items = (
-            GardenItem.objects.filter(user=request.user, date__gte=start_date, date__lte=end_date)
-            .values("date")
-            .annotate(
-                total=Count("id"),
-                completed=Count("id", filter=models.Q(is_dead=False)),
-                aborted=Count("id", filter=models.Q(is_dead=True)),
-            )
-            .order_by("date")
-        )
-        category_breakdown = (
-            GardenItem.objects.filter(user=request.user, date__gte=start_date, date__lte=end_date)
-            .values("date", "category")
-            .annotate(
-                total=Count("id"),
-                completed=Count("id", filter=models.Q(is_dead=False)),
-                aborted=Count("id", filter=models.Q(is_dead=True)),
-            )
-            .order_by("date")
-        )
-        summary_map = {entry["date"]: dict(entry, by_category={}) for entry in items}
-        for entry in category_breakdown:
-            date_key = entry["date"]
-            summary = summary_map.setdefault(
-                date_key,
-                {
-                    "date": date_key,
-                    "total": 0,
-                    "completed": 0,
-                    "aborted": 0,
-                    "by_category": {},
-                },
-            )
-            category_name = entry["category"] or "未分类"
-            summary["by_category"][category_name] = {
-                "total": entry["total"],
-                "completed": entry["completed"],
-                "aborted": entry["aborted"],
+        date_range, error = garden_date_range(request.query_params, "week", ("week", "month"))
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+        start_date, end_date = date_range
+
+        by_date, by_category = garden_summary_querysets(request.user, start_date, end_date)
+        return Response(garden_summary_payload(by_date, by_category))
+
+
+class DashboardView(APIView):
+    """首页聚合接口：今日任务、今日统计、今日心情、公告与花园概览一次返回"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        today = timezone.localdate()
+        totals = focus_totals(request.user, today)
+        streak = streak_days(request.user, today)
+        tasks = Task.objects.filter(user=request.user, is_today=True).order_by("-created_at")
+        mood = MoodRecord.objects.filter(user=request.user, date=today).first()
+        announcements = Announcement.objects.filter(is_published=True)
+
+        return Response(
+            {
+                "tasks": TaskSerializer(tasks, many=True).data,
+                "today_stats": TodayStatsSerializer(
+                    {
+                        "today_minutes": totals["today_minutes"],
+                        "today_sessions": totals["today_sessions"],
+                        "streak_days": streak,
+                    }
+                ).data,
+                "mood": MoodRecordSerializer(mood).data if mood else {"mood": None, "note": ""},
+                "announcements": AnnouncementSerializer(announcements, many=True).data,
+                "garden": GardenViewSerializer(
+                    {
+                        "total_sessions": totals["all_sessions"],
+                        "completed_count": totals["all_completed"],
+                        "aborted_count": totals["all_aborted"],
+                        "streak_days": streak,
+                        "today_focus_minutes": totals["today_minutes"],
+                    }
+                ).data,
             }
-        return Response([summary_map[key] for key in sorted(summary_map.keys())])
+        )
+
+
+class ExportView(APIView):
+    """流式导出个人全部数据：format=ndjson|csv（或 Accept 头），type 为逗号分隔的分区（CSV 仅支持单个分区）"""
+
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [JSONRenderer, NDJSONStreamRenderer, CSVStreamRenderer]
+
+    def get(self, request):
+        # format 参数由 DRF 内容协商处理，未知格式直接返回 404；默认 JSON 协商结果按 NDJSON 导出
+        fmt = request.accepted_renderer.format
+        if fmt not in EXPORT_FORMATS:
+            fmt = "ndjson"
+        raw_types = request.query_params.get("type", "")
+        sections = [item.strip() for item in raw_types.split(",") if item.strip()] or list(EXPORT_SECTIONS)
+        unknown = [item for item in sections if item not in EXPORT_SECTIONS]
+        if unknown:
+            return Response({"detail": f"未知的导出类型: {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+        if fmt == "csv" and len(sections) != 1:
+            return Response({"detail": "CSV 导出需要通过 type 指定单个类型"}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        username = request.query_params.get("username")
+        if username and username != user.username:
+            if not IsAdminUserRole().has_permission(request, self):
+                return Response({"detail": "仅管理员可导出其他用户的数据"}, status=status.HTTP_403_FORBIDDEN)
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                return Response({"detail": "用户不存在"}, status=status.HTTP_404_NOT_FOUND)
+        return stream_async(request, export_response(user, fmt, sections))
 
 
 class AdminOverviewView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminUserRole]
 
     def get(self, request):
-        now = timezone.now()
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_sessions = FocusSession.objects.filter(created_at__gte=start_of_day)
-        total_focus_minutes = FocusSession.objects.aggregate(total=Sum("duration_minutes"))["total"] or 0
-        top_scene = (
-            UserProfile.objects.values("default_scene")
-            .annotate(count=Count("id"))
-            .order_by("-count")
-            .first()
-        )
-        today_plan_users = (
-            Task.objects.filter(is_today=True)
-            .values("user_id")
-            .annotate(count=Count("id"))
-            .count()
-        )
+        counters = read_counters()
+        today = SiteDailyRollup.objects.filter(date=timezone.localdate()).first()
+        scenes = [
+            (value, name[len(SCENE_PREFIX):])
+            for name, value in counters.items()
+            if name.startswith(SCENE_PREFIX) and value > 0
+        ]
+        top_scene = max(scenes)[1] if scenes else None
         return Response(
             {
-                "total_users": User.objects.count(),
-                "total_focus_minutes": total_focus_minutes,
-                "today_focus_minutes": today_sessions.aggregate(total=Sum("duration_minutes"))["total"] or 0,
-                "today_sessions": today_sessions.count(),
-                "top_scene": top_scene["default_scene"] if top_scene else None,
-                "today_plan_users": today_plan_users,
+                "total_users": int(counters.get(USERS, 0)),
+                "total_focus_minutes": counters.get(FOCUS_MINUTES, 0),
+                "today_focus_minutes": today.total_minutes if today else 0,
+                "today_sessions": today.session_count if today else 0,
+                "top_scene": top_scene,
+                "today_plan_users": int(counters.get(TODAY_PLAN_USERS, 0)),
             }
         )
 
 
+class AdminMetricsView(APIView):
+    """Prometheus 文本格式的进程内请求指标"""
+
+    permission_classes = [permissions.IsAuthenticated, IsAdminUserRole]
+
+    def get(self, request):
+        return HttpResponse(metrics_registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+ADMIN_USER_ORDERINGS = {
+    "date_joined": ("date_joined", "id"),
+    "-date_joined": ("-date_joined", "-id"),
+    "username": ("username",),
+    "-username": ("-username",),
+    # 直接按 UserStats 列排序，可沿 userstats_minutes_user_idx 索引顺序读取，无需临时排序
+    "total_focus_minutes": ("stats__total_focus_minutes", "stats__user"),
+    "-total_focus_minutes": ("-stats__total_focus_minutes", "-stats__user"),
+}
+
+
+def admin_user_queryset(request):
+    """管理员用户列表：前缀搜索走索引范围查询，累计数据读取 UserStats 预计算值"""
+    # 每个用户都有 UserStats（auth_user 的插入触发器写入，见迁移 0017），stats__isnull=False 使其成为内连接
+    users = User.objects.select_related("profile").filter(stats__isnull=False).annotate(
+        total_focus_minutes=F("stats__total_focus_minutes"),
+        total_sessions=F("stats__total_sessions"),
+    )
+    search = request.query_params.get("search", "").strip()
+    if search:
+        upper = search + "\U0010ffff"
+        by_username = User.objects.filter(username__gte=search, username__lt=upper).values("id")
+        by_nickname = UserProfile.objects.filter(nickname__gte=search, nickname__lt=upper).values("user_id")
+        users = users.filter(Q(id__in=by_username) | Q(id__in=by_nickname))
+    ordering = ADMIN_USER_ORDERINGS.get(request.query_params.get("ordering"), ADMIN_USER_ORDERINGS["-date_joined"])
+    return users.order_by(*ordering)
+
+
 class AdminUserListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminUserRole]
     serializer_class = AdminUserSerializer
+    pagination_class = AdminUserPagination
 
     def get_queryset(self):
-        return (
-            User.objects.all()
-            .annotate(
-                total_focus_minutes=Coalesce(Sum("sessions__duration_minutes"), 0),
-                total_sessions=Coalesce(Count("sessions"), 0),
-            )
-            .select_related("profile")
-            .order_by("-date_joined")
+        return admin_user_queryset(self.request)
+
+
+class AdminUserExportView(APIView):
+    """以流式 CSV 导出用户列表，逐批读取，不在内存中构建完整列表"""
+
+    permission_classes = [permissions.IsAuthenticated, IsAdminUserRole]
+    renderer_classes = [JSONRenderer, CSVStreamRenderer]
+
+    def get(self, request):
+        rows = admin_user_queryset(request).values_list(
+            "id",
+            "username",
+            "profile__nickname",
+            "profile__role",
+            "date_joined",
+            "total_focus_minutes",
+            "total_sessions",
+        )
+        response = csv_response(
+            "users.csv",
+            ["id", "username", "nickname", "role", "date_joined", "total_focus_minutes", "total_sessions"],
+            rows.iterator(chunk_size=1000),
         )
+        return stream_async(request, response)
 
 
 class AnnouncementViewSet(viewsets.ModelViewSet):
@@ -477,19 +893,6 @@ class PublishedAmbientSoundViewSet(viewsets.ReadOnlyModelViewSet):
         return AmbientSound.objects.filter(is_published=True, key__in=self.allowed_scenes)
 
     def list(self, request, *args, **kwargs):
-        media_root = Path(settings.MEDIA_ROOT)
-        media_url = settings.MEDIA_URL or "/media/"
-        sounds = []
-        for sound in self.get_queryset():
-            if sound.key == "none":
-                sounds.append(sound)
-                continue
-            if sound.file and Path(sound.file.path).exists():
-                sounds.append(sound)
-                continue
-            if sound.file_url and sound.file_url.startswith(media_url):
-                relative_path = sound.file_url.replace(media_url, "").lstrip("/")
-                if (media_root / relative_path).exists():
-                    sounds.append(sound)
+        sounds = sound_manifest.get(self.get_queryset())
         serializer = self.get_serializer(sounds, many=True)
         return Response(serializer.data)
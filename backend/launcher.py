@@ -1,7 +1,11 @@
+import hashlib
 import json
 import os
 import shutil
+import socket
 import sys
+import threading
+import time
 import webbrowser
 from pathlib import Path
 
@@ -69,7 +73,158 @@ def ensure_ambient_sounds(manifest):
             sound.save(update_fields=["file_url", "is_published"])
 
 
+STATE_FILENAME = "launcher_state.json"
+
+
+class StartupTimer:
+    """记录启动各阶段耗时（毫秒），便于比较冷启动与快速启动"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = []
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def report(self) -> str:
+        total = (time.perf_counter() - self.started) * 1000
+        details = ", ".join(f"{name} {elapsed:.0f}ms" for name, elapsed in self.phases)
+        return f"启动耗时 {total:.0f}ms（{details}）"
+
+
+def load_state(data_dir: Path) -> dict:
+    try:
+        with (data_dir / STATE_FILENAME).open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(data_dir: Path, state: dict):
+    path = data_dir / STATE_FILENAME
+    temp_path = path.with_suffix(".tmp")
+    with temp_path.open("w", encoding="utf-8") as handle:
+        json.dump(state, handle)
+    os.replace(temp_path, path)
+
+
+def fingerprint(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def migrations_fingerprint() -> str:
+    """代码中全部迁移的名称；只读取迁移模块，不访问数据库"""
+    from django.conf import settings
+    from django.db.migrations.loader import MigrationLoader
+
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    return fingerprint(str(settings.DATABASES["default"]["NAME"]), sorted(loader.disk_migrations))
+
+
+def sounds_fingerprint(base_dir: Path, sounds_dir: Path) -> str:
+    manifest_path = base_dir / "bootstrap" / "sound_sources.json"
+    manifest_bytes = manifest_path.read_bytes() if manifest_path.exists() else b""
+    return fingerprint(manifest_bytes, sorted(entry.name for entry in os.scandir(sounds_dir)))
+
+
+def apply_migrations(state: dict) -> bool:
+    """迁移指纹与上次一致且数据库文件存在时跳过 migrate；数据库是新建的则同时作废环境音同步指纹"""
+    from django.conf import settings
+
+    current = migrations_fingerprint()
+    database_exists = Path(settings.DATABASES["default"]["NAME"]).exists()
+    if database_exists and state.get("migrations") == current:
+        return False
+    call_command("migrate", interactive=False)
+    state["migrations"] = current
+    if not database_exists:
+        # 新建的数据库里没有环境音记录，即使音频目录未变也要重新同步
+        state.pop("sounds", None)
+    return True
+
+
+def sync_sounds_in_background(base_dir: Path, sounds_dir: Path, data_dir: Path, state: dict, state_lock):
+    """后台同步内置环境音，不阻塞服务器启动；指纹未变化时直接跳过"""
+    current = sounds_fingerprint(base_dir, sounds_dir)
+    if state.get("sounds") == current:
+        return None
+
+    def run():
+        from django.db import connection
+
+        try:
+            manifest = load_sound_manifest(base_dir)
+            sync_sounds(base_dir, sounds_dir, manifest)
+            ensure_ambient_sounds(manifest)
+            with state_lock:
+                # 复制文件后目录内容变化，记录同步完成后的指纹
+                state["sounds"] = sounds_fingerprint(base_dir, sounds_dir)
+                save_state(data_dir, state)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run, name="sound-sync", daemon=True)
+    thread.start()
+    return thread
+
+
+def open_browser_when_ready(url: str, host: str, port: int, timer: StartupTimer, timeout: float = 30.0):
+    """等待服务器套接字可以接受连接后再打开浏览器"""
+
+    def run():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection((host, port), timeout=0.5):
+                    break
+            except OSError:
+                time.sleep(0.05)
+        timer.mark("server ready")
+        print(timer.report(), flush=True)
+        webbrowser.open(url)
+
+    threading.Thread(target=run, name="open-browser", daemon=True).start()
+
+
+def select_server_mode() -> str:
+    """TIMEGARDEN_SERVER_MODE=asgi 时使用 uvicorn（可选依赖），未安装则回退到 waitress"""
+    mode = os.environ.get("TIMEGARDEN_SERVER_MODE", "wsgi").lower()
+    if mode == "asgi":
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            print("未安装 uvicorn，回退到 WSGI 模式", flush=True)
+            mode = "wsgi"
+    # settings 在 django.setup() 时读取该变量，决定是否启用异步视图
+    os.environ["TIMEGARDEN_SERVER_MODE"] = mode
+    return mode
+
+
+def create_wsgi_server(host: str, port: int):
+    from timegarden.wsgi import application
+    from waitress import create_server
+
+    server = create_server(application, host=host, port=port)
+    return server.run
+
+
+def create_asgi_server(host: str, port: int):
+    import uvicorn
+    from timegarden.asgi import application
+
+    config = uvicorn.Config(application, host=host, port=port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    return server.run
+
+
 def main():
+    timer = StartupTimer()
     base_dir = get_base_dir()
     appdata_root = Path(os.environ.get("APPDATA", Path.home() / "AppData" / "Roaming"))
     data_dir = Path(os.environ.get("TIMEGARDEN_DATA_DIR", appdata_root / "TimeGarden"))
@@ -77,23 +232,30 @@ def main():
     os.environ.setdefault("TIMEGARDEN_STATIC_DIR", str(base_dir / "static" / "app"))
     os.environ.setdefault("TIMEGARDEN_DEBUG", "false")
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "timegarden.settings")
+    server_mode = select_server_mode()
 
     django.setup()
+    timer.mark("django setup")
 
     sounds_dir = ensure_data_dirs(data_dir)
-    call_command("migrate", interactive=False)
-
-    manifest = load_sound_manifest(base_dir)
-    sync_sounds(base_dir, sounds_dir, manifest)
-    ensure_ambient_sounds(manifest)
+    # TIMEGARDEN_FORCE_STARTUP_CHECKS=true 时忽略记录的指纹，完整执行迁移与环境音同步
+    state = {} if os.environ.get("TIMEGARDEN_FORCE_STARTUP_CHECKS", "false").lower() == "true" else load_state(data_dir)
+    state_lock = threading.Lock()
+    migrated = apply_migrations(state)
+    if migrated:
+        with state_lock:
+            save_state(data_dir, state)
+    timer.mark("migrate" if migrated else "migrate skipped")
 
-    url = "http://127.0.0.1:8000"
-    webbrowser.open(url)
-
-    from timegarden.wsgi import application
-    from waitress import serve
+    # 迁移完成后才能写入 AmbientSound，因此同步放在迁移之后的后台线程
+    sync_sounds_in_background(base_dir, sounds_dir, data_dir, state, state_lock)
+    timer.mark("sound sync scheduled")
 
-    serve(application, host="127.0.0.1", port=8000)
+    host, port = "127.0.0.1", 8000
+    run_server = create_asgi_server(host, port) if server_mode == "asgi" else create_wsgi_server(host, port)
+    timer.mark("server created")
+    open_browser_when_ready(f"http://{host}:{port}", host, port, timer)
+    run_server()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+import io
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from core.streaming import stream_async
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """把文件的 [start, start + length) 区间包装成独立的只读文件：read 不越过区间末尾，seek/tell 以区间起点为 0。
+
+    可定位的文件对象会被 FileResponse 用来计算 Content-Length，并由 WSGI 服务器的 file_wrapper（waitress）直接读取发送。
+    """
+
+    def __init__(self, handle, start, length):
+        handle.seek(start)
+        self.handle = handle
+        self.start = start
+        self.length = length
+        self.position = 0
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.length
+        self.position = min(max(offset, 0), self.length)
+        self.handle.seek(self.start + self.position)
+        return self.position
+
+    def read(self, size=-1):
+        remaining = self.length - self.position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if size <= 0:
+            return b""
+        data = self.handle.read(size)
+        self.position += len(data)
+        return data
+
+    def close(self):
+        self.handle.close()
+
+
+def parse_range(header, size):
+    """解析单区间 Range 头，返回 (start, end)；无法满足返回 False，不支持的格式返回 None（按完整文件处理）"""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N：最后 N 个字节
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """If-Range 与当前版本一致时才返回部分内容，否则返回完整文件"""
+    value = request.META.get("HTTP_IF_RANGE")
+    if not value:
+        return True
+    if value.startswith(('"', "W/")):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+@require_safe
+def serve_media(request, path):
+    """媒体文件服务：支持 Range/206、ETag/Last-Modified 条件请求与长期缓存"""
+    try:
+        full_path = Path(safe_join(settings.MEDIA_ROOT, path))
+        stat = full_path.stat()
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404("文件不存在")
+    if not full_path.is_file():
+        raise Http404("文件不存在")
+
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{size:x}")
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = None
+        range_header = request.META.get("HTTP_RANGE")
+        if range_header and if_range_matches(request, etag, last_modified):
+            byte_range = parse_range(range_header, size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+        elif byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            content_type = mimetypes.guess_type(full_path.name)[0] or "application/octet-stream"
+            # Content-Length 由 FileResponse 按区间长度设置
+            response = FileResponse(
+                FileRange(open(full_path, "rb"), start, length), status=206, content_type=content_type
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            # 完整文件交给 FileResponse，WSGI 服务器支持 file_wrapper 时由服务器直接读取文件发送
+            response = FileResponse(open(full_path, "rb"))
+
+    response["Accept-Ranges"] = "bytes"
+    if response.status_code != 416:
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, public=True, max_age=settings.TIMEGARDEN_MEDIA_MAX_AGE)
+    return stream_async(request, response)
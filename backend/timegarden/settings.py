@@ -36,6 +36,23 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# 可选的请求计时：Server-Timing 响应头 + 慢请求日志（附带最慢的 SQL）
+TIMEGARDEN_SERVER_TIMING = os.environ.get("TIMEGARDEN_SERVER_TIMING", "false").lower() == "true"
+TIMEGARDEN_SLOW_REQUEST_MS = float(os.environ.get("TIMEGARDEN_SLOW_REQUEST_MS", "500"))
+TIMEGARDEN_SLOW_REQUEST_QUERIES = int(os.environ.get("TIMEGARDEN_SLOW_REQUEST_QUERIES", "50"))
+TIMEGARDEN_SLOW_REQUEST_SQL_LIMIT = int(os.environ.get("TIMEGARDEN_SLOW_REQUEST_SQL_LIMIT", "20"))
+# 进程内请求指标（/api/admin/metrics/），默认开启
+TIMEGARDEN_METRICS = os.environ.get("TIMEGARDEN_METRICS", "true").lower() == "true"
+TIMEGARDEN_METRICS_BUCKETS = [
+    float(bound)
+    for bound in os.environ.get("TIMEGARDEN_METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10").split(",")
+]
+if TIMEGARDEN_METRICS:
+    MIDDLEWARE.insert(0, "core.metrics.MetricsMiddleware")
+if TIMEGARDEN_SERVER_TIMING:
+    # 放在最外层，total 覆盖其余全部中间件
+    MIDDLEWARE.insert(0, "core.middleware.ServerTimingMiddleware")
+
 ROOT_URLCONF = 'timegarden.urls'
 
 TEMPLATES = [
@@ -63,6 +80,24 @@ DATABASES = {
     }
 }
 
+# SQLite 调优：每个新连接执行一次 PRAGMA，默认值面向桌面版 waitress 多线程场景
+if os.environ.get("TIMEGARDEN_SQLITE_TUNING", "true").lower() == "true":
+    SQLITE_PRAGMAS = {
+        "journal_mode": os.environ.get("TIMEGARDEN_SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.environ.get("TIMEGARDEN_SQLITE_SYNCHRONOUS", "NORMAL"),
+        "mmap_size": int(os.environ.get("TIMEGARDEN_SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+        # 负数表示以 KiB 为单位，-20000 约为 20MB
+        "cache_size": int(os.environ.get("TIMEGARDEN_SQLITE_CACHE_SIZE", "-20000")),
+        "temp_store": os.environ.get("TIMEGARDEN_SQLITE_TEMP_STORE", "MEMORY"),
+    }
+    DATABASES['default']['OPTIONS'] = {
+        'init_command': ";".join(f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()),
+        # 等价于 PRAGMA busy_timeout，单位为秒
+        'timeout': int(os.environ.get("TIMEGARDEN_SQLITE_BUSY_TIMEOUT_MS", "5000")) / 1000,
+        # 写事务开始即加写锁，避免读锁升级为写锁时直接报 database is locked
+        'transaction_mode': os.environ.get("TIMEGARDEN_SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+    }
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = 'zh-hans'
@@ -75,13 +110,31 @@ STATICFILES_DIRS = [STATIC_APP_DIR]
 STATIC_ROOT = DATA_DIR / "staticfiles"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = DATA_DIR / 'media'
+# 媒体文件（环境音等）的浏览器缓存时长，过期后通过 ETag 重新验证
+TIMEGARDEN_MEDIA_MAX_AGE = int(os.environ.get("TIMEGARDEN_MEDIA_MAX_AGE", str(7 * 24 * 3600)))
+# 已发布环境音列表缓存检查音频目录 mtime 的最小间隔（秒）
+TIMEGARDEN_SOUND_MANIFEST_CHECK_INTERVAL = float(os.environ.get("TIMEGARDEN_SOUND_MANIFEST_CHECK_INTERVAL", "5"))
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# 缓存：默认进程内存缓存，设置 TIMEGARDEN_CACHE_DIR 后改用文件缓存
+CACHE_DIR = os.environ.get("TIMEGARDEN_CACHE_DIR")
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache'
+        if CACHE_DIR
+        else 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': CACHE_DIR or 'timegarden',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get("TIMEGARDEN_CACHE_MAX_ENTRIES", "5000"))},
+    }
+}
+# 统计类接口按用户缓存的秒数，写入数据时会立即失效
+TIMEGARDEN_STATS_CACHE_TIMEOUT = int(os.environ.get("TIMEGARDEN_STATS_CACHE_TIMEOUT", "300"))
+
 # DRF 配置：默认 Token 认证
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -89,6 +142,28 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Token 认证的进程内缓存（条目数上限与存活秒数），登出/删除 token/修改角色时立即失效
+TIMEGARDEN_AUTH_CACHE_SIZE = int(os.environ.get("TIMEGARDEN_AUTH_CACHE_SIZE", "1024"))
+TIMEGARDEN_AUTH_CACHE_TTL = int(os.environ.get("TIMEGARDEN_AUTH_CACHE_TTL", "300"))
+
+# 任务/专注记录列表的游标分页（携带 cursor 或 page_size 参数时启用）
+TIMEGARDEN_PAGE_SIZE = int(os.environ.get("TIMEGARDEN_PAGE_SIZE", "50"))
+TIMEGARDEN_MAX_PAGE_SIZE = int(os.environ.get("TIMEGARDEN_MAX_PAGE_SIZE", "200"))
+
+# 批量写入专注记录时单次请求的最大条数
+TIMEGARDEN_BULK_SESSION_LIMIT = int(os.environ.get("TIMEGARDEN_BULK_SESSION_LIMIT", "500"))
+# 批量导入/批量修改任务时单次请求的最大条数
+TIMEGARDEN_BULK_TASK_LIMIT = int(os.environ.get("TIMEGARDEN_BULK_TASK_LIMIT", "1000"))
+
+# archive_focus_sessions 默认归档多少天之前的专注记录与花园条目
+TIMEGARDEN_ARCHIVE_AFTER_DAYS = int(os.environ.get("TIMEGARDEN_ARCHIVE_AFTER_DAYS", "365"))
+
+# 服务模式：wsgi（waitress）或 asgi（uvicorn）；ASGI 模式下统计与花园读取接口使用异步视图
+TIMEGARDEN_SERVER_MODE = os.environ.get("TIMEGARDEN_SERVER_MODE", "wsgi").lower()
+TIMEGARDEN_ASYNC_VIEWS = (
+    os.environ.get("TIMEGARDEN_ASYNC_VIEWS", str(TIMEGARDEN_SERVER_MODE == "asgi")).lower() == "true"
+)
+
 # CORS 设置：允许本地前端访问
 CORS_ALLOW_ALL_ORIGINS = True
 # 如果想限制来源，可以改为：
@@ -0,0 +1,86 @@
+import gzip
+import hashlib
+import threading
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，缺失时只提供 gzip
+    brotli = None
+
+
+def accepted_encodings(header):
+    """解析 Accept-Encoding，返回 q 值大于 0 的编码集合"""
+    encodings = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+class SpaShell:
+    """内存中的 SPA 入口页：首次请求读取并预压缩，文件 mtime 或大小变化时重新加载"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._variants = {}
+
+    def variants(self):
+        try:
+            stat = self.path.stat()
+        except OSError:
+            raise Http404("SPA index not found")
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._variants = self._load()
+                    self._signature = signature
+        return self._variants
+
+    def _load(self):
+        body = self.path.read_bytes()
+        digest = hashlib.md5(body).hexdigest()
+        # 每种编码是不同的表示，使用各自的强 ETag
+        variants = {"identity": (body, quote_etag(digest))}
+        variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), quote_etag(f"{digest}-gz"))
+        if brotli is not None:
+            variants["br"] = (brotli.compress(body), quote_etag(f"{digest}-br"))
+        return variants
+
+
+spa_shell = SpaShell(settings.STATIC_APP_DIR / "index.html")
+
+
+@require_safe
+def spa_fallback(request):
+    variants = spa_shell.variants()
+    accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    encoding = next((name for name in ("br", "gzip") if name in variants and name in accepted), "identity")
+    body, etag = variants[encoding]
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type="text/html; charset=utf-8")
+        if encoding != "identity":
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    patch_vary_headers(response, ["Accept-Encoding"])
+    # 入口页引用带哈希的资源文件，必须每次校验才能及时拿到新版本
+    patch_cache_control(response, no_cache=True)
+    return response
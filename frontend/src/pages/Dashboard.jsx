@@ -42,10 +42,23 @@ export default function Dashboard() {
     }
   };
 
+  const fetchDashboard = async () => {
+    setLoadingTasks(true);
+    try {
+      const res = await api.get('/dashboard/');
+      setStats(res.data.today_stats);
+      setTasks(res.data.tasks);
+      setAnnouncements(res.data.announcements);
+      setActiveTab('today');
+    } catch (err) {
+      console.error(err);
+    } finally {
+      setLoadingTasks(false);
+    }
+  };
+
   useEffect(() => {
-    fetchStats();
-    fetchTasks('today');
-    api.get('/announcements/').then((res) => setAnnouncements(res.data.results || res.data));
+    fetchDashboard();
   }, []);
 
   const toggleToday = async (taskId) => {